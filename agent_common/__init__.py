@@ -0,0 +1,3 @@
+# Modules shared by task-1, task-2 and the travel planner: agent metrics,
+# tool and model caches, the rule based pre-router and the in-memory Mongo
+# stand-in. Install the repo once with `pip install -e .` to import them.
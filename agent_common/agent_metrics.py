@@ -0,0 +1,239 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from agents import Runner, RunHooks
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Histogram buckets in seconds, from a fast tool call to a long agent run
+DURATION_BUCKETS = tuple(float(b) for b in os.getenv(
+    "METRICS_DURATION_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120"
+).split(","))
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels, value: float):
+        with self._lock:
+            # Per label set: count per bucket (last one is +Inf), sum
+            entry = self._values.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0])
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, [('le', bound)])} {cumulative}")
+
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+agent_run_duration = Histogram("agent_run_duration_seconds", "Duration of Runner.run calls.", ("agent", "stage"))
+agent_runs = Counter("agent_runs_total", "Runner.run calls.", ("agent", "stage"))
+agent_run_errors = Counter("agent_run_errors_total", "Runner.run calls that raised.", ("agent", "stage", "error"))
+model_call_duration = Histogram("model_call_duration_seconds", "Duration of single model calls.", ("agent", "stage"))
+model_tokens = Counter("model_tokens_total", "Tokens used by model calls.", ("agent", "stage", "kind"))
+tool_call_duration = Histogram("tool_call_duration_seconds", "Duration of function tool calls.", ("agent", "stage", "tool"))
+tool_calls = Counter("tool_calls_total", "Function tool calls.", ("agent", "stage", "tool"))
+tool_errors = Counter("tool_errors_total", "Function tool calls that raised.", ("agent", "stage", "tool", "error"))
+router_decisions = Counter("router_decisions_total", "Pre-router decisions, fallback, ambiguous and excluded go to LLM triage.", ("router", "route"))
+
+METRICS = [
+    agent_run_duration, agent_runs, agent_run_errors,
+    model_call_duration, model_tokens,
+    tool_call_duration, tool_calls, tool_errors,
+    router_decisions,
+]
+
+# Labels of the run the current task belongs to, read by instrumented tools
+_current_run = contextvars.ContextVar("current_run", default=None)
+
+
+# Run hooks that time model calls and follow handoffs, so every sample is
+# labelled with the agent that is actually running
+class MetricsHooks(RunHooks):
+
+    def __init__(self, agent: str, stage: str):
+        self.agent = agent
+        self.stage = stage
+        self._llm_started = {}
+
+    async def on_agent_start(self, context, agent):
+        self.agent = agent.name
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self._llm_started[agent.name] = time.perf_counter()
+
+    async def on_llm_end(self, context, agent, response):
+        start = self._llm_started.pop(agent.name, None)
+        if start is not None:
+            model_call_duration.observe(agent.name, self.stage, value=time.perf_counter() - start)
+
+        usage = response.usage
+        model_tokens.inc(agent.name, self.stage, "input", amount=usage.input_tokens)
+        model_tokens.inc(agent.name, self.stage, "output", amount=usage.output_tokens)
+
+
+# Runner.run with duration, token, tool and error metrics labelled by agent and stage
+async def instrumented_run(agent, input, stage: str = "default", **kwargs):
+    hooks = MetricsHooks(agent.name, stage)
+    if kwargs.get("hooks") is None:
+        kwargs["hooks"] = hooks
+
+    token = _current_run.set(hooks)
+    agent_runs.inc(agent.name, stage)
+    start = time.perf_counter()
+
+    try:
+        return await Runner.run(agent, input, **kwargs)
+    except Exception as e:
+        agent_run_errors.inc(agent.name, stage, type(e).__name__)
+        raise
+    finally:
+        agent_run_duration.observe(agent.name, stage, value=time.perf_counter() - start)
+        _current_run.reset(token)
+
+
+# Count and time a tool function. Stack it under @function_tool:
+#
+#   @function_tool
+#   @instrumented_tool
+#   async def web_scraping_tool(wrapper: RunContextWrapper[TaskContext], url: str) -> str:
+#
+# Inside instrumented_run the samples carry the agent and stage of the run.
+def instrumented_tool(func=None, *, name: str = None):
+
+    def decorator(func):
+        tool_name = name or func.__name__
+
+        def labels():
+            run = _current_run.get()
+            return (run.agent, run.stage) if run else ("none", "none")
+
+        def record(agent, stage, start, error=None):
+            tool_calls.inc(agent, stage, tool_name)
+            tool_call_duration.observe(agent, stage, tool_name, value=time.perf_counter() - start)
+            if error is not None:
+                tool_errors.inc(agent, stage, tool_name, type(error).__name__)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                agent, stage = labels()
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    record(agent, stage, start, e)
+                    raise
+                record(agent, stage, start)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            agent, stage = labels()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                record(agent, stage, start, e)
+                raise
+            record(agent, stage, start)
+            return result
+
+        return sync_wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Standalone /metrics endpoint for entry points without a web app (CLI runs)
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body = render_metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
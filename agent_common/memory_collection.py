@@ -0,0 +1,117 @@
+import copy
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+# Small stand-in for a pymongo collection, used with DATABASE_URL=memory://
+class InMemoryCollection:
+
+    def __init__(self):
+        self.documents = []
+        # Unique field -> partial filter of the index ({} when it covers every document)
+        self.unique_fields = {}
+
+    def create_index(self, keys, unique=False, partialFilterExpression=None, **kwargs):
+        field = keys[0][0] if isinstance(keys, list) else keys
+        if unique:
+            self.unique_fields[field] = partialFilterExpression or {}
+        return f"{field}_1"
+
+    def insert_one(self, document):
+        self._check_unique(document)
+        self.documents.append(copy.deepcopy(document))
+
+    def insert_many(self, documents, ordered=True):
+        errors = []
+        for index, document in enumerate(documents):
+            try:
+                self.insert_one(document)
+            except DuplicateKeyError as e:
+                errors.append({'index': index, 'code': DUPLICATE_KEY_ERROR, 'errmsg': str(e)})
+                if ordered:
+                    break
+
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'nInserted': len(documents) - len(errors)})
+
+    def update_one(self, filter, update, upsert=False):
+        for document in self.documents:
+            if self._matches_filter(document, filter):
+                document.update(copy.deepcopy(update.get('$set', {})))
+                for key in update.get('$unset', {}):
+                    document.pop(key, None)
+                return
+
+        if upsert:
+            document = {key: value for key, value in filter.items() if not isinstance(value, dict)}
+            document.update(update.get('$setOnInsert', {}))
+            document.update(update.get('$set', {}))
+            self.insert_one(document)
+
+    def find(self, filter=None, projection=None):
+        return [
+            self._project(document, projection) for document in self.documents
+            if self._matches_filter(document, filter)
+        ]
+
+    def find_one(self, filter=None, projection=None, sort=None):
+        documents = self.documents
+        if sort:
+            field, direction = sort[0]
+            documents = sorted((d for d in documents if field in d), key=lambda d: d[field], reverse=direction < 0)
+
+        for document in documents:
+            if self._matches_filter(document, filter):
+                return self._project(document, projection)
+        return None
+
+    def _matches_filter(self, document, filter):
+        for key, expected in (filter or {}).items():
+            # $exists looks at the document, a stored None still exists
+            if isinstance(expected, dict) and '$exists' in expected:
+                if (key in document) != bool(expected['$exists']):
+                    return False
+                expected = {op: value for op, value in expected.items() if op != '$exists'}
+
+            if not self._matches(document.get(key), expected):
+                return False
+        return True
+
+    # Equality or the comparison operators the query cache and checkpoints use
+    def _matches(self, actual, expected):
+        if not isinstance(expected, dict):
+            return actual == expected
+
+        operators = {
+            '$eq': lambda a, b: a == b,
+            '$gt': lambda a, b: a is not None and a > b,
+            '$gte': lambda a, b: a is not None and a >= b,
+            '$lt': lambda a, b: a is not None and a < b,
+            '$lte': lambda a, b: a is not None and a <= b,
+            '$in': lambda a, b: a in b,
+        }
+        return all(operators[op](actual, value) for op, value in expected.items())
+
+    # Like Mongo, a missing field is indexed as null unless the partial filter leaves the document out
+    def _check_unique(self, document):
+        for field, partial_filter in self.unique_fields.items():
+            if not self._matches_filter(document, partial_filter):
+                continue
+
+            value = document.get(field)
+            if any(d.get(field) == value for d in self.documents if self._matches_filter(d, partial_filter)):
+                raise DuplicateKeyError(f"Duplicate key {field}: {value}")
+
+    def _project(self, document, projection):
+        if not projection:
+            return copy.deepcopy(document)
+
+        included = {key for key, value in projection.items() if value and key != "_id"}
+
+        # Only exclusions, like {'_id': 0}: everything else is returned
+        if not included:
+            excluded = {key for key, value in projection.items() if not value}
+            return {key: copy.deepcopy(value) for key, value in document.items() if key not in excluded}
+
+        return {key: copy.deepcopy(value) for key, value in document.items() if key in included}
@@ -0,0 +1,192 @@
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+from agents import Runner, FunctionTool
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Model cache settings
+# "off":    always run the agent (default)
+# "record": serve from the cache, run the agent and store the output on a miss
+# "replay": serve from the cache only, a miss raises ModelCacheMissError
+MODEL_CACHE_MODE = os.getenv("MODEL_CACHE_MODE", "off")
+MODEL_CACHE_PATH = os.getenv("MODEL_CACHE_PATH", "model_cache.sqlite3")
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", 50000))
+# Seconds a recorded output is served, 0 keeps it until it is evicted
+MODEL_CACHE_TTL = float(os.getenv("MODEL_CACHE_TTL", 24 * 60 * 60))
+
+
+class ModelCacheMissError(Exception):
+    pass
+
+
+# What cached_run returns on a hit, same accessors as the SDK's RunResult
+@dataclasses.dataclass
+class CachedRunResult:
+    final_output: Any
+    cached: bool = True
+
+    def final_output_as(self, cls, raise_if_incorrect_type: bool = False):
+        if raise_if_incorrect_type and not isinstance(self.final_output, cls):
+            raise TypeError(f"Final output is not of type {cls.__name__}")
+        return self.final_output
+
+
+def _describe(value):
+    if callable(value):
+        return getattr(value, "__qualname__", repr(value))
+    return value
+
+
+# Everything that decides the agent's answer: model, settings, instructions,
+# tool and output schemas, and the input
+def cache_key(agent, input) -> str:
+    model = agent.model if isinstance(agent.model, str) or agent.model is None else getattr(agent.model, "model", repr(agent.model))
+
+    tools = []
+    for tool in agent.tools:
+        if isinstance(tool, FunctionTool):
+            tools.append({"name": tool.name, "schema": tool.params_json_schema})
+        else:
+            tools.append({"name": getattr(tool, "name", type(tool).__name__)})
+
+    output_type = agent.output_type
+    output_schema = output_type.model_json_schema() if isinstance(output_type, type) and issubclass(output_type, BaseModel) else repr(output_type)
+
+    payload = {
+        "model": model,
+        "model_settings": dataclasses.asdict(agent.model_settings),
+        "instructions": _describe(agent.instructions),
+        "tools": tools,
+        "handoffs": [getattr(handoff, "name", repr(handoff)) for handoff in agent.handoffs],
+        "output_schema": output_schema,
+        "input": input,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# Validated agent outputs in a local SQLite file with LRU eviction
+class ModelCache:
+
+    def __init__(self, path: str = MODEL_CACHE_PATH, max_entries: int = MODEL_CACHE_MAX_ENTRIES, ttl: float = MODEL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS model_cache (
+                key TEXT PRIMARY KEY,
+                agent TEXT NOT NULL,
+                output TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_model_cache_access ON model_cache (last_access)")
+        self._db.commit()
+
+    def get(self, key: str):
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute("SELECT output, created_at FROM model_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                return None
+
+            self._db.execute("UPDATE model_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+        return json.loads(row[0])
+
+    def set(self, key: str, agent_name: str, output):
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO model_cache VALUES (?, ?, ?, ?, ?)",
+                (key, agent_name, json.dumps(output), now, now),
+            )
+            self._db.execute("""
+                DELETE FROM model_cache WHERE key IN (
+                    SELECT key FROM model_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM model_cache").fetchone()[0]
+
+        return {
+            'mode': MODEL_CACHE_MODE,
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'recorded': self.recorded,
+        }
+
+
+_model_cache = None
+
+
+def get_model_cache() -> ModelCache:
+    global _model_cache
+
+    if _model_cache is None:
+        _model_cache = ModelCache()
+    return _model_cache
+
+
+def _dump(agent, final_output):
+    if isinstance(final_output, BaseModel):
+        return final_output.model_dump(mode="json")
+    return final_output
+
+
+def _load(agent, output):
+    output_type = agent.output_type
+    if isinstance(output_type, type) and issubclass(output_type, BaseModel):
+        return output_type.model_validate(output)
+    return output
+
+
+# Drop-in for Runner.run on deterministic structured-output agents, guardrail
+# agents included. The key covers the instructions and output schema, so a
+# policy change misses, and MODEL_CACHE_TTL bounds how long a decision lives.
+# Pass run=instrumented_run (plus its stage) to keep metrics on misses.
+# SQLite calls run in a worker thread so hits never block the event loop
+async def cached_run(agent, input, mode: str = None, run=Runner.run, **kwargs):
+    mode = mode or MODEL_CACHE_MODE
+
+    if mode == "off":
+        return await run(agent, input, **kwargs)
+
+    cache = await asyncio.to_thread(get_model_cache)
+    key = cache_key(agent, input)
+
+    output = await asyncio.to_thread(cache.get, key)
+    if output is not None:
+        cache.hits += 1
+        return CachedRunResult(final_output=_load(agent, output))
+
+    cache.misses += 1
+    if mode == "replay":
+        raise ModelCacheMissError(f"No recorded output for agent '{agent.name}' and this input.")
+
+    result = await run(agent, input, **kwargs)
+    await asyncio.to_thread(cache.set, key, agent.name, _dump(agent, result.final_output))
+    cache.recorded += 1
+
+    return result
@@ -0,0 +1,85 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from agent_common.agent_metrics import router_decisions
+
+FALLBACK = "fallback"
+AMBIGUOUS = "ambiguous"
+EXCLUDED = "excluded"
+
+
+@dataclass
+class Route:
+    name: str
+    target: object
+    patterns: list = field(default_factory=list)
+    rules: list = field(default_factory=list)
+
+    def matches(self, text: str) -> bool:
+        return any(pattern.search(text) for pattern in self.patterns) or any(rule(text) for rule in self.rules)
+
+
+# Rule based dispatch in front of an LLM triage agent. Requests that clearly
+# match exactly one route go straight to its target (usually a specialist
+# agent) and save the triage model turn. Everything else, including text that
+# matches more than one route or an exclusion, returns None so the caller
+# falls back to triage.
+#
+#   router = PreRouter("travel")
+#   router.add_route("flight", flight_agent, r"\bflights?\s+from\b.+\bto\b")
+#   router.exclude(r"\b(trip|itinerary)\b")
+#   route = router.route(query)   # Route or None
+class PreRouter:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.routes = []
+        self.exclusions = []
+        self.counts = {FALLBACK: 0, AMBIGUOUS: 0, EXCLUDED: 0}
+        self._lock = threading.Lock()
+
+    # Patterns are regular expressions (case insensitive), rules are callables text -> bool
+    def add_route(self, name: str, target, *patterns, rules=()):
+        route = Route(name, target, [re.compile(p, re.IGNORECASE) for p in patterns], list(rules))
+        self.routes.append(route)
+        self.counts.setdefault(name, 0)
+        return route
+
+    # Text matching an exclusion always goes to triage, for requests that name a
+    # specialist's subject but ask for more than the specialist answers
+    def exclude(self, *patterns, rules=()):
+        exclusion = Route(EXCLUDED, None, [re.compile(p, re.IGNORECASE) for p in patterns], list(rules))
+        self.exclusions.append(exclusion)
+        return exclusion
+
+    def route(self, text):
+        if not isinstance(text, str):
+            self._count(FALLBACK)
+            return None
+
+        if any(exclusion.matches(text) for exclusion in self.exclusions):
+            self._count(EXCLUDED)
+            return None
+
+        matched = [route for route in self.routes if route.matches(text)]
+
+        if len(matched) == 1:
+            self._count(matched[0].name)
+            return matched[0]
+
+        self._count(AMBIGUOUS if matched else FALLBACK)
+        return None
+
+    def _count(self, decision: str):
+        with self._lock:
+            self.counts[decision] += 1
+        router_decisions.inc(self.name, decision)
+
+    def stats(self):
+        total = sum(self.counts.values())
+        routed = total - self.counts[FALLBACK] - self.counts[AMBIGUOUS] - self.counts[EXCLUDED]
+        return {
+            'decisions': dict(self.counts),
+            'turns_saved': routed,
+            'routed_rate': routed / total if total else 0.0,
+        }
@@ -0,0 +1,276 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from agents import RunContextWrapper
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Tool cache settings
+TOOL_CACHE_BACKEND = os.getenv("TOOL_CACHE_BACKEND", "memory")
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH", "tool_cache.sqlite3")
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", 5 * 60))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 10000))
+
+
+# In-process LRU with an expiry time per entry
+class MemoryBackend:
+
+    # Cheap enough to call on the event loop
+    blocking = False
+
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry[2] <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, value, duration: float, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, duration, time.time() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# SQLite file shared across runs, least recently used rows are evicted
+class DiskBackend:
+
+    # Async tools call it from a worker thread
+    blocking = True
+
+    def __init__(self, path: str = TOOL_CACHE_PATH, max_entries: int = TOOL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tool_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                duration REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_tool_cache_access ON tool_cache (last_access)")
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, duration, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            if row[2] <= now:
+                self._db.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE tool_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, duration: float, ttl: float):
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value), duration, now + ttl, now),
+            )
+            self._db.execute("""
+                DELETE FROM tool_cache WHERE key IN (
+                    SELECT key FROM tool_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tool_cache").fetchone()[0]
+
+
+_backends = {}
+_stats = {}
+
+
+def get_backend(name: str = TOOL_CACHE_BACKEND):
+    if name not in _backends:
+        _backends[name] = DiskBackend() if name == "disk" else MemoryBackend()
+    return _backends[name]
+
+
+# Per tool hit rate and time saved by cache hits
+def tool_cache_stats():
+    stats = {}
+
+    for tool, counters in _stats.items():
+        calls = counters['hits'] + counters['misses'] + counters['coalesced']
+        stats[tool] = {
+            **counters,
+            'hit_rate': (counters['hits'] + counters['coalesced']) / calls if calls else 0.0,
+        }
+
+    return stats
+
+
+# Memoize a tool function. Stack it under @function_tool:
+#
+#   @function_tool
+#   @cached_tool(ttl=600, context_fields=("preferred_airlines",))
+#   def get_flights_tool(wrapper: RunContextWrapper[UserContext], origin: str, ...):
+#
+# The key is built from the tool arguments plus the selected fields of the run
+# context. Concurrent identical calls share a single execution, for async tools
+# on the event loop and for sync tools on the SDK's worker threads.
+def cached_tool(ttl: float = TOOL_CACHE_TTL, context_fields=(), backend: str = None, name: str = None):
+
+    def decorator(func):
+        tool_name = name or func.__name__
+        signature = inspect.signature(func)
+        store = get_backend(backend or TOOL_CACHE_BACKEND)
+        counters = _stats.setdefault(tool_name, {'hits': 0, 'misses': 0, 'coalesced': 0, 'saved_seconds': 0.0})
+        inflight = {}
+        # Sync tools run on worker threads, so their in-flight map and the
+        # counters are guarded by a lock
+        lock = threading.Lock()
+        threaded_inflight = {}
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            arguments = {}
+            context = {}
+            for param, value in bound.arguments.items():
+                if isinstance(value, RunContextWrapper):
+                    user_context = value.context
+                    context = {field: getattr(user_context, field, None) for field in context_fields} if user_context else {}
+                else:
+                    arguments[param] = value
+
+            return json.dumps([tool_name, arguments, context], sort_keys=True, default=str)
+
+        def record_hit(duration):
+            with lock:
+                counters['hits'] += 1
+                counters['saved_seconds'] += duration
+
+        def count(field):
+            with lock:
+                counters[field] += 1
+
+        # Disk reads and writes run in a worker thread, like scrape_cache, so
+        # async tools never block the event loop on SQLite
+        async def call_store(method, *args):
+            if store.blocking:
+                return await asyncio.to_thread(method, *args)
+            return method(*args)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+
+                cached = await call_store(store.get, key)
+                if cached is not None:
+                    record_hit(cached[1])
+                    return cached[0]
+
+                # Same call already running, share its result
+                if key in inflight:
+                    count('coalesced')
+                    return await asyncio.shield(inflight[key])
+
+                count('misses')
+                start = time.perf_counter()
+                future = asyncio.ensure_future(func(*args, **kwargs))
+                inflight[key] = future
+
+                # Stays in flight until stored, so later callers never miss both
+                try:
+                    value = await asyncio.shield(future)
+                    await call_store(store.set, key, value, time.perf_counter() - start, ttl)
+                finally:
+                    inflight.pop(key, None)
+
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+
+            cached = store.get(key)
+            if cached is not None:
+                record_hit(cached[1])
+                return cached[0]
+
+            # Same call already running on another thread, wait for its result
+            with lock:
+                future = threaded_inflight.get(key)
+                if future is None:
+                    future = concurrent.futures.Future()
+                    threaded_inflight[key] = future
+                    owner = True
+                else:
+                    counters['coalesced'] += 1
+                    owner = False
+
+            if not owner:
+                return future.result()
+
+            try:
+                # The previous owner may have stored it since our first lookup
+                cached = store.get(key)
+                if cached is not None:
+                    record_hit(cached[1])
+                    value = cached[0]
+                else:
+                    count('misses')
+                    start = time.perf_counter()
+                    value = func(*args, **kwargs)
+                    store.set(key, value, time.perf_counter() - start, ttl)
+                future.set_result(value)
+            except BaseException as error:
+                future.set_exception(error)
+                raise
+            finally:
+                with lock:
+                    threaded_inflight.pop(key, None)
+
+            return value
+
+        return sync_wrapper
+
+    return decorator
@@ -0,0 +1,312 @@
+"""Offline end to end benchmark of the agent pipelines.
+
+Every model call goes to the scripted fake model in fake_model.py, Mongo is
+the in-memory stand-in (DATABASE_URL=memory://) and the scraper reads a local
+HTML page, so nothing leaves the machine and runs are repeatable. With the
+model latency known, what is left of each request is the orchestration
+overhead of this code: agent construction, guardrails, handoffs, tool
+dispatch, caches and Mongo writes.
+
+Pipelines:
+  task2   task_2.run_task (web search -> scrape -> tutorial -> ResultStore)
+  travel  travel_planner.run_travel_agent (budget guardrail, handoffs, tools)
+  triage  first-agent triage_agent (homework guardrail, tutor handoff)
+  search  ai_agent_searching_storing.generate_response (query cache, writer)
+
+Usage: python benchmarks/bench_agents.py [-p task2,travel] [-n 200] [-c 20] [--latency 0.05] [--memory] [-o results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="agents-bench-")
+
+# Must be set before the pipeline modules are imported
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ["DATABASE_URL"] = "memory://"
+os.environ.setdefault("MODEL_CACHE_MODE", "off")
+os.environ.setdefault("MODEL_CACHE_PATH", os.path.join(WORKDIR, "model_cache.sqlite3"))
+os.environ.setdefault("SCRAPE_CACHE_PATH", os.path.join(WORKDIR, "scrape_cache.sqlite3"))
+os.environ.setdefault("TOOL_CACHE_PATH", os.path.join(WORKDIR, "tool_cache.sqlite3"))
+os.environ.setdefault("MONGO_FLUSH_INTERVAL", "0.05")
+
+for directory in ("task-1", "task-2", "travel_agent_planner"):
+    sys.path.append(os.path.join(ROOT, directory))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_model import install_fake_model, measure_model_wait
+
+PAGE = ("<html><head><title>Asyncio tutorial</title></head><body>"
+        + "".join(f"<p>Paragraph {i} about coroutines, tasks and event loops.</p>" for i in range(200))
+        + "</body></html>").encode()
+
+TRAVEL_QUERIES = [
+    "I'm planning a trip to Miami for 5 days with a budget of $2000. What should I do there?",
+    "I need a flight from New York to Chicago tomorrow",
+    "Find me a hotel in Paris with a pool for under $400 per night",
+]
+
+TRIAGE_QUERIES = [
+    "Help with my math homework: what is the derivative of x^2?",
+    "For my history homework, who was the first president of the United States?",
+    "Can you explain this homework question about photosynthesis?",
+]
+
+
+class PageHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_page_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/asyncio-tutorial"
+
+
+# Each setup returns (request(i), close(), stats())
+
+async def setup_task2():
+    import task_2
+    from http_client import start_http_client, close_http_client
+    from scrape_cache import scrape_cache
+
+    await start_http_client()
+    await task_2.result_store.start()
+
+    async def request(i):
+        task_id = task_2.create_new_task(f"python asyncio tutorial {i}")
+        await task_2.run_task(task_id)
+
+        status = task_2.get_status(task_id)
+        if status != "Done":
+            raise RuntimeError(status)
+
+    async def close():
+        await task_2.result_store.stop()
+        await close_http_client()
+        scrape_cache.close()
+
+    def stats():
+        return {'result_store': task_2.result_store.stats(), 'stored': len(task_2.collection.documents)}
+
+    return request, close, stats
+
+
+async def setup_travel():
+    import travel_planner
+    from agent_common.tool_cache import tool_cache_stats
+
+    async def request(i):
+        context = travel_planner.UserContext(user_id=f"bench-{i}", preferred_airlines=["IB"], hotel_amenities=["pool"])
+        await travel_planner.run_travel_agent(TRAVEL_QUERIES[i % len(TRAVEL_QUERIES)], context=context)
+
+    async def close():
+        pass
+
+    def stats():
+        return {'tool_cache': tool_cache_stats(), 'pre_router': travel_planner.travel_router.stats()}
+
+    return request, close, stats
+
+
+async def setup_triage():
+    spec = importlib.util.spec_from_file_location("first_agent", os.path.join(ROOT, "task-1", "first-agent.py"))
+    first_agent = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(first_agent)
+
+    async def request(i):
+        await first_agent.run_triage(TRIAGE_QUERIES[i % len(TRIAGE_QUERIES)])
+
+    async def close():
+        await asyncio.gather(*first_agent.audit_tasks, return_exceptions=True)
+
+    def stats():
+        classifier = first_agent.homework_classifier
+        return {'homework_classifier': classifier.stats() if classifier else None,
+                'pre_router': first_agent.triage_router.stats()}
+
+    return request, close, stats
+
+
+async def setup_search():
+    import ai_agent_searching_storing as search
+
+    async def request(i):
+        await search.generate_response(f"what is python asyncio {i}")
+
+    async def close():
+        await asyncio.to_thread(search.query_writer.stop)
+
+    def stats():
+        return {'query_writer': search.query_writer.stats(), 'query_cache': search.query_cache.stats(),
+                'stored': len(search.collection.documents)}
+
+    return request, close, stats
+
+
+PIPELINES = {
+    "task2": setup_task2,
+    "travel": setup_travel,
+    "triage": setup_triage,
+    "search": setup_search,
+}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'mean_ms': sum(values) / len(values) * 1000 if values else 0.0,
+    }
+
+
+async def bench_pipeline(name, model, timer, requests: int, concurrency: int, memory: bool, quiet: bool):
+    output = io.StringIO() if quiet else sys.stdout
+
+    with contextlib.redirect_stdout(output):
+        request, close, stats = await PIPELINES[name]()
+
+        # Warm up imports, clients and lazy indexes outside the measurement
+        await request(-1)
+
+    timer.samples.clear()
+    timer.tokens.clear()
+    calls_before = model.calls
+
+    latencies, overheads, errors = [], [], []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            waited = measure_model_wait()
+            start = time.perf_counter()
+            try:
+                await request(i)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                return
+
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            overheads.append(elapsed - sum(waited))
+
+    if memory:
+        tracemalloc.start()
+
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        wall = time.perf_counter() - start
+
+    peak = 0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    with contextlib.redirect_stdout(output):
+        await close()
+
+    return {
+        'pipeline': name,
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'first_errors': errors[:3],
+        'wall_s': wall,
+        'throughput_rps': len(latencies) / wall if wall else 0.0,
+        'latency': summarize(latencies),
+        'overhead': summarize(overheads),
+        'model_calls_per_request': (model.calls - calls_before) / requests if requests else 0.0,
+        'tokens_per_request': {agent: tokens / requests for agent, tokens in timer.tokens.items()},
+        'stages': {stage: summarize(values) for stage, values in sorted(timer.samples.items())},
+        'traced_peak_mb': peak / 1024 / 1024,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'stats': stats(),
+    }
+
+
+def print_report(result):
+    latency, overhead = result['latency'], result['overhead']
+
+    print(f"\n== {result['pipeline']}: {result['requests']} requests, concurrency {result['concurrency']} ==")
+    print(f"throughput {result['throughput_rps']:.1f} req/s, errors {result['errors']}, "
+          f"model calls/request {result['model_calls_per_request']:.1f}")
+    print(f"end to end  p50 {latency['p50_ms']:8.1f} ms  p95 {latency['p95_ms']:8.1f} ms")
+    print(f"overhead    p50 {overhead['p50_ms']:8.1f} ms  p95 {overhead['p95_ms']:8.1f} ms  (minus fake model latency, includes queueing)")
+    print(f"memory      max rss {result['max_rss_mb']:.0f} MB" +
+          (f", traced peak {result['traced_peak_mb']:.1f} MB" if result['traced_peak_mb'] else ""))
+
+    print(f"{'stage':48} {'count':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    for stage, summary in result['stages'].items():
+        print(f"{stage:48} {summary['count']:>7} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f}")
+
+    for error in result['first_errors']:
+        print(f"error: {error}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipelines against a scripted fake model.")
+    parser.add_argument("-p", "--pipelines", default=",".join(PIPELINES), help="comma separated: " + ", ".join(PIPELINES))
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model latency per call in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- jitter on the latency in seconds")
+    parser.add_argument("--memory", action="store_true", help="trace Python allocations (slows the run down)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="keep the pipelines' own prints")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.pipelines.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PIPELINES]
+    if unknown:
+        parser.error(f"unknown pipelines: {', '.join(unknown)}")
+
+    server, page_url = start_page_server()
+    model, timer = install_fake_model(latency=args.latency, jitter=args.jitter, arguments={"url": page_url})
+
+    results = []
+    for name in names:
+        result = await bench_pipeline(name, model, timer, args.requests, args.concurrency, args.memory, not args.verbose)
+        print_report(result)
+        results.append(result)
+
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,323 @@
+"""Scripted stand-in for the model API, used by the offline benchmarks.
+
+The fake model never calls the network. Each turn it sleeps for the configured
+latency and then answers from the request alone:
+
+1. hand off to a specialist whose first name word appears in the user message
+   ("flight" -> Flight Specialist, "math" -> Math Tutor)
+2. otherwise call every function tool the agent has not called yet, with
+   arguments built from the tool schema and CANNED_ARGUMENTS
+3. otherwise return the final output, JSON built from the output schema for
+   structured agents or a short text answer
+
+install_fake_model() routes every Runner.run in the process through it.
+"""
+import asyncio
+import contextvars
+import json
+import random
+import time
+import uuid
+from agents import Model, ModelProvider, RunConfig, RunHooks, FunctionTool, Usage, set_tracing_disabled
+from agents.items import ModelResponse
+from agents.run import AgentRunner, set_default_agent_runner
+from openai.types.responses import (
+    Response, ResponseCompletedEvent, ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText,
+    ResponseTextDeltaEvent, ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+# Tool arguments by parameter name, anything else is derived from the schema type
+CANNED_ARGUMENTS = {
+    "city": "Paris",
+    "origin": "JFK",
+    "destination": "ORD",
+    "date": "2025-06-01",
+    "check_in": "2025-06-01",
+    "check_out": "2025-06-04",
+    "max_price": 400,
+    "query": "python asyncio tutorial",
+    "url": "http://127.0.0.1/",
+}
+
+# Seconds spent waiting on the fake model by the current request, see measure_model_wait()
+_model_wait = contextvars.ContextVar("model_wait", default=None)
+
+
+def _get(item, key, default=None):
+    if isinstance(item, dict):
+        return item.get(key, default)
+    return getattr(item, key, default)
+
+
+def _text(content):
+    if isinstance(content, str):
+        return content
+    return " ".join(_get(part, "text", "") or "" for part in content or [])
+
+
+# Minimal value that validates against a (strict) JSON schema
+def fake_from_schema(schema, defs=None):
+    defs = defs if defs is not None else schema.get("$defs", {})
+
+    if "$ref" in schema:
+        return fake_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return fake_from_schema(options[0], defs) if options else None
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), None)
+
+    if kind == "object":
+        return {name: fake_from_schema(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_from_schema(schema.get("items", {}), defs)]
+    if kind == "string":
+        return schema["enum"][0] if "enum" in schema else "sample"
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 100.0
+    if kind == "boolean":
+        return True
+    return None
+
+
+def fake_arguments(tool: FunctionTool, overrides: dict):
+    properties = tool.params_json_schema.get("properties", {})
+    return {
+        name: overrides[name] if name in overrides else fake_from_schema(prop, tool.params_json_schema.get("$defs", {}))
+        for name, prop in properties.items()
+    }
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedModel(Model):
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, arguments: dict = None, answer_chars: int = 400):
+        self.latency = latency
+        self.jitter = jitter
+        self.arguments = {**CANNED_ARGUMENTS, **(arguments or {})}
+        self.answer_chars = answer_chars
+        self.calls = 0
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None):
+        self.calls += 1
+        delay = max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay)
+
+        waited = _model_wait.get()
+        if waited is not None:
+            waited.append(delay)
+
+        items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+        output = self._respond(items, tools, output_schema, handoffs)
+
+        prompt_text = (system_instructions or "") + json.dumps(items, default=str)
+        output_text = json.dumps([item.model_dump() for item in output])
+        input_tokens, output_tokens = _tokens(prompt_text), _tokens(output_text)
+
+        return ModelResponse(
+            output=output,
+            usage=Usage(requests=1, input_tokens=input_tokens, output_tokens=output_tokens,
+                        total_tokens=input_tokens + output_tokens),
+            response_id=None,
+        )
+
+    # Same scripted response, sent as text deltas followed by response.completed
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, conversation_id=None, prompt=None):
+        response = await self.get_response(system_instructions, input, model_settings, tools, output_schema,
+                                           handoffs, tracing)
+        sequence = 0
+
+        for output_index, item in enumerate(response.output):
+            if not isinstance(item, ResponseOutputMessage):
+                continue
+            for content_index, part in enumerate(item.content):
+                for start in range(0, len(part.text), 40):
+                    yield ResponseTextDeltaEvent(
+                        type="response.output_text.delta", item_id=item.id, output_index=output_index,
+                        content_index=content_index, delta=part.text[start:start + 40], logprobs=[],
+                        sequence_number=sequence,
+                    )
+                    sequence += 1
+
+        usage = response.usage
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=sequence,
+            response=Response(
+                id=f"resp_{uuid.uuid4().hex}", created_at=time.time(), model="scripted", object="response",
+                output=response.output, tool_choice="auto", tools=[], parallel_tool_calls=False,
+                usage=ResponseUsage(
+                    input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                    total_tokens=usage.total_tokens,
+                    input_tokens_details=InputTokensDetails(cached_tokens=0, cache_write_tokens=0),
+                    output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+                ),
+            ),
+        )
+
+    def _respond(self, items, tools, output_schema, handoffs):
+        # Look at what happened since the latest user message
+        last_user = max((i for i, item in enumerate(items) if _get(item, "role") == "user"), default=0)
+        message = _text(_get(items[last_user], "content")).lower() if items else ""
+        called = {_get(item, "name") for item in items[last_user:] if _get(item, "type") == "function_call"}
+
+        for handoff in handoffs:
+            keyword = handoff.agent_name.split()[0].lower()
+            if keyword in message and handoff.tool_name not in called:
+                return [self._call(handoff.tool_name, {})]
+
+        pending = [tool for tool in tools if isinstance(tool, FunctionTool) and tool.name not in called]
+        if pending:
+            return [self._call(tool.name, fake_arguments(tool, self.arguments)) for tool in pending]
+
+        if output_schema is not None and not output_schema.is_plain_text():
+            text = json.dumps(fake_from_schema(output_schema.json_schema()))
+        else:
+            text = ("Scripted answer to: " + message + " ") * (self.answer_chars // (len(message) + 21) + 1)
+            text = text[:self.answer_chars]
+
+        return [ResponseOutputMessage(
+            id=f"msg_{uuid.uuid4().hex}",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )]
+
+    def _call(self, name, arguments):
+        return ResponseFunctionToolCall(
+            id=f"fc_{uuid.uuid4().hex}",
+            call_id=f"call_{uuid.uuid4().hex}",
+            type="function_call",
+            name=name,
+            arguments=json.dumps(arguments),
+            status="completed",
+        )
+
+
+class ScriptedModelProvider(ModelProvider):
+
+    def __init__(self, model: ScriptedModel):
+        self.model = model
+
+    def get_model(self, model_name):
+        return self.model
+
+
+# Per agent model turn and per tool timings, collected through run hooks
+class StageTimer(RunHooks):
+
+    def __init__(self):
+        self.samples = {}
+        self.tokens = {}
+        self._started = {}
+
+    def record(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self._started[(id(context), "llm", agent.name)] = time.perf_counter()
+
+    async def on_llm_end(self, context, agent, response):
+        start = self._started.pop((id(context), "llm", agent.name), None)
+        if start is not None:
+            self.record(f"model:{agent.name}", time.perf_counter() - start)
+        self.tokens[agent.name] = self.tokens.get(agent.name, 0) + response.usage.total_tokens
+
+    async def on_tool_start(self, context, agent, tool):
+        key = (id(context), "tool", getattr(context, "tool_call_id", tool.name))
+        self._started[key] = time.perf_counter()
+
+    async def on_tool_end(self, context, agent, tool, result):
+        key = (id(context), "tool", getattr(context, "tool_call_id", tool.name))
+        start = self._started.pop(key, None)
+        if start is not None:
+            self.record(f"tool:{tool.name}", time.perf_counter() - start)
+
+
+# Passes every run hook to several hook objects, so the stage timer also sees
+# runs that bring their own hooks (agent_metrics.instrumented_run)
+class ChainedHooks(RunHooks):
+
+    def __init__(self, *hooks):
+        self.hooks = hooks
+
+    async def on_agent_start(self, context, agent):
+        for hooks in self.hooks:
+            await hooks.on_agent_start(context, agent)
+
+    async def on_agent_end(self, context, agent, output):
+        for hooks in self.hooks:
+            await hooks.on_agent_end(context, agent, output)
+
+    async def on_handoff(self, context, from_agent, to_agent):
+        for hooks in self.hooks:
+            await hooks.on_handoff(context, from_agent, to_agent)
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        for hooks in self.hooks:
+            await hooks.on_llm_start(context, agent, system_prompt, input_items)
+
+    async def on_llm_end(self, context, agent, response):
+        for hooks in self.hooks:
+            await hooks.on_llm_end(context, agent, response)
+
+    async def on_tool_start(self, context, agent, tool):
+        for hooks in self.hooks:
+            await hooks.on_tool_start(context, agent, tool)
+
+    async def on_tool_end(self, context, agent, tool, result):
+        for hooks in self.hooks:
+            await hooks.on_tool_end(context, agent, tool, result)
+
+
+# Runner that gives every run the scripted provider and the stage hooks,
+# including the runs started inside guardrails and pipeline stages
+class ScriptedRunner(AgentRunner):
+
+    def __init__(self, provider: ScriptedModelProvider, hooks: StageTimer):
+        self.provider = provider
+        self.hooks = hooks
+
+    def _options(self, kwargs):
+        # Runner.run passes None for options the caller left out
+        if kwargs.get("run_config") is None:
+            kwargs["run_config"] = RunConfig(model_provider=self.provider, tracing_disabled=True)
+        hooks = kwargs.get("hooks")
+        kwargs["hooks"] = self.hooks if hooks is None else ChainedHooks(self.hooks, hooks)
+        return kwargs
+
+    async def run(self, starting_agent, input, **kwargs):
+        return await super().run(starting_agent, input, **self._options(kwargs))
+
+    def run_streamed(self, starting_agent, input, **kwargs):
+        return super().run_streamed(starting_agent, input, **self._options(kwargs))
+
+
+def install_fake_model(latency: float = 0.05, jitter: float = 0.0, arguments: dict = None):
+    model = ScriptedModel(latency=latency, jitter=jitter, arguments=arguments)
+    timer = StageTimer()
+
+    set_tracing_disabled(True)
+    set_default_agent_runner(ScriptedRunner(ScriptedModelProvider(model), timer))
+
+    return model, timer
+
+
+# Collects the fake model latency spent inside one request, including child
+# tasks it starts. Call at the start of the request, read the list at the end
+def measure_model_wait():
+    waited = []
+    _model_wait.set(waited)
+    return waited
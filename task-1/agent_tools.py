@@ -3,6 +3,8 @@ from pydantic import BaseModel
 import asyncio
 import os
 from dotenv import load_dotenv
+from agent_common.tool_cache import cached_tool
+from agent_common.model_cache import cached_run
 
 # Setup api key 
 load_dotenv()
@@ -10,6 +12,7 @@ api_key = os.getenv("OPENAI_API_KEY")
 os.environ["OPENAI_API_KEY"] = api_key
 
 @function_tool
+@cached_tool(ttl=10 * 60)
 def get_weather(city: str) -> str:
     return f"The weather in {city} is sunny."
 
@@ -50,7 +53,7 @@ async def main():
     print(result.final_output)
 
     input_text = "We have a team meeting on March 25th with Alice, Bob, and Charlie."
-    result = await Runner.run(calender_agent,input_text)
+    result = await cached_run(calender_agent,input_text)
     calendar_event = result.final_output_as(CalenderEvent)
 
     print(calendar_event)
@@ -60,7 +63,7 @@ async def main():
 
 
     # date extractor
-    result = await Runner.run(date_extractor_agent,input_text)
+    result = await cached_run(date_extractor_agent,input_text)
     date = result.final_output_as(DateFetch)
     print(date.date)
       
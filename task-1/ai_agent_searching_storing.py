@@ -1,17 +1,36 @@
 import os 
+import asyncio
 from dotenv import load_dotenv
 from pymongo import MongoClient
-from agents import Agent, Runner, WebSearchTool, TContext, function_tool
+from agents import Agent, WebSearchTool, TContext, function_tool
+from query_writer import QueryResultWriter
+from query_cache import QueryCache, index_fields
+from agent_common.memory_collection import InMemoryCollection
+from agent_common.agent_metrics import instrumented_run, instrumented_tool
 
 # Setup API key 
 load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
 # Setup MongoDB connection
-database_url = os.getenv("DATABASE_URL")
-mongo_client = MongoClient(database_url)
-db = mongo_client.get_database('Query_Results')
-collection = db['queryResult']
+def initialize_db():
+    database_url = os.getenv("DATABASE_URL")
+
+    # Same in-memory stand-in as task-2, for local runs and benchmarks
+    if database_url and database_url.startswith("memory://"):
+        return InMemoryCollection()
+
+    mongo_client = MongoClient(database_url)
+    db = mongo_client.get_database('Query_Results')
+    return db['queryResult']
+
+collection = initialize_db()
+
+# "direct" writes results from a background writer, "agent" asks
+# mongodb_store_agent to call the store_in_mongodb tool
+STORAGE_MODE = os.getenv("STORAGE_MODE", "direct")
+query_writer = QueryResultWriter(collection)
+query_cache = QueryCache(collection)
 
 
 # Web Search Agent
@@ -24,9 +43,11 @@ webSearch_agent = Agent(
 
 # Custom databse storage tool
 @function_tool
+@instrumented_tool
 async def store_in_mongodb(query: str, result: str) -> str:
     try:
-        collection.insert_one({"query": query, "result": result})
+        # Index fields let the query cache find this result in Mongo
+        await asyncio.to_thread(collection.insert_one, {"query": query, "result": result, **index_fields(query)})
         return "Data successfully stored in MongoDB."
     except Exception as e:
         return f"Error storing data: {str(e)}"
@@ -41,9 +62,14 @@ mongodb_store_agent = Agent(
 
 async def generate_response(query):
     input_text = query
+
+    # Answered recently, skip the agents
+    cached_result = await query_cache.get(input_text)
+    if cached_result is not None:
+        return cached_result
     
     # Runnign Web Search Agent
-    web_result = await Runner.run(webSearch_agent, input_text)
+    web_result = await instrumented_run(webSearch_agent, input_text, stage="web_search")
 
     # Structuring data
     structured_data = {
@@ -51,11 +77,18 @@ async def generate_response(query):
         "result": web_result.final_output
     }
 
+    query_cache.put(input_text, web_result.final_output)
+
     # Store the data in MongoDB
-    store_result = await Runner.run(
-        mongodb_store_agent, 
-        [{"role": "user", "content": str(structured_data)}]
-    )
+    if STORAGE_MODE == "agent":
+        store_result = await instrumented_run(
+            mongodb_store_agent, 
+            [{"role": "user", "content": str(structured_data)}],
+            stage="store",
+        )
+    else:
+        # Index fields let the query cache find this result in Mongo
+        query_writer.write({**structured_data, **index_fields(input_text)})
 
     return web_result.final_output
 
@@ -1,9 +1,15 @@
-from flask import Flask, request, jsonify
-import asyncio
-from ai_agent_searching_storing import generate_response
+from flask import Flask, Response, request, jsonify
+import os
+from concurrent.futures import TimeoutError
+from ai_agent_searching_storing import generate_response, query_cache
+from event_loop import background_loop
+from agent_common.agent_metrics import render_metrics, CONTENT_TYPE
 
 app = Flask(__name__)
 
+# Seconds a /search request waits for the agents before giving up
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", 120))
+
 @app.route('/search',methods=['GET'])
 
 def search():
@@ -12,7 +18,12 @@ def search():
     if not query:
         return jsonify({'error': 'Missing query parameter'}), 400
     else:    
-        result = asyncio.run(generate_response(query))
+        # Shared long-lived event loop instead of a new loop per request
+        try:
+            result = background_loop.run(generate_response(query), timeout=SEARCH_TIMEOUT)
+        except TimeoutError:
+            return jsonify({'error': 'Search timed out'}), 504
+
         response = {
             'success': True,
             'query': f'Search for: {query}',
@@ -21,5 +32,19 @@ def search():
         return jsonify(response), 200
 
 
+# Query cache hit/miss counters
+@app.route('/cache',methods=['GET'])
+
+def cache_stats():
+    return jsonify(query_cache.stats()), 200
+
+
+# Agent, model and tool metrics in Prometheus text format
+@app.route('/metrics',methods=['GET'])
+
+def metrics():
+    return Response(render_metrics(), content_type=CONTENT_TYPE), 200
+
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
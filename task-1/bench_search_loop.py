@@ -0,0 +1,85 @@
+"""Requests per second of asyncio.run per request vs the shared background loop.
+
+Each simulated /search call makes one HTTP request to a local server, the way
+generate_response talks to the model API. With asyncio.run every call needs a
+new client (and a new connection). On the background loop one pooled client
+is shared by all calls.
+
+Usage: python bench_search_loop.py [requests] [concurrency]
+"""
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from event_loop import BackgroundLoop
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"output": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+# Before: new loop and new client for every request
+def per_request_call(url):
+    async def call():
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url)
+            return response.json()
+
+    return asyncio.run(call())
+
+
+# After: one loop, one pooled client
+def background_call(loop, url, shared):
+    async def call():
+        if "client" not in shared:
+            shared["client"] = httpx.AsyncClient()
+        response = await shared["client"].get(url)
+        return response.json()
+
+    return loop.run(call())
+
+
+def measure(label, func, requests, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: func(), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"  {label:<24} {requests / elapsed:9.1f} req/s   ({elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    server, url = start_server()
+    loop = BackgroundLoop()
+    shared = {}
+
+    print(f"{requests} requests, {concurrency} concurrent Flask threads")
+    measure("asyncio.run per request", lambda: per_request_call(url), requests, concurrency)
+    measure("background loop", lambda: background_call(loop, url, shared), requests, concurrency)
+
+    loop.run(shared["client"].aclose())
+    loop.stop()
+    server.shutdown()
@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pydantic import BaseModel
+from agent_tools import CalenderEvent, calender_agent
+from agent_common.agent_metrics import instrumented_run
+
+# python calendar_batch.py -i emails.jsonl -o events.jsonl -c 8 --rpm 300
+#
+# Input lines are {"id": "...", "text": "..."} or plain JSON strings (.jsonl),
+# or one text per line for any other file. Without an id the line number is
+# used. Results are appended to the output file as they finish, one
+# {"id": ..., "event": {...}} or {"id": ..., "error": "..."} per line. Running
+# again with the same output file skips the ids that already have an event.
+
+BATCH_SIZE = int(os.getenv("CALENDAR_BATCH_SIZE", 8))
+BATCH_CHARS = int(os.getenv("CALENDAR_BATCH_CHARS", 6000))
+MAX_RETRIES = int(os.getenv("CALENDAR_MAX_RETRIES", 3))
+RETRY_BACKOFF = float(os.getenv("CALENDAR_RETRY_BACKOFF", 1.0))
+
+
+class CalenderEventItem(BaseModel):
+    id: str
+    event: CalenderEvent
+
+class CalenderEventBatch(BaseModel):
+    events: list[CalenderEventItem]
+
+# Several short texts in one structured-output request
+batch_calender_agent = calender_agent.clone(
+    name="Calendar batch extractor",
+    instructions="You get a JSON list of texts, each with an id. Extract the calendar event from every text "
+                 "and return exactly one entry per id, using the id you were given.",
+    output_type=CalenderEventBatch,
+)
+
+
+# Spaces out request starts to stay under a requests per minute limit
+class RateLimiter:
+
+    def __init__(self, per_minute: float = 0):
+        self.interval = 60 / per_minute if per_minute else 0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+
+        now = time.monotonic()
+        delay = self._next - now
+        self._next = max(now, self._next) + self.interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def read_texts(stream, jsonl: bool = True):
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if not jsonl:
+            yield {"id": str(line_number), "text": line}
+            continue
+
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"text": item}
+
+        item["id"] = str(item.get("id", line_number))
+        yield item
+
+
+# Cut a line left half written by an interrupted run, so the next record
+# starts on a line of its own
+def trim_partial_line(path: str):
+    if not path or not os.path.exists(path):
+        return
+
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size
+
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+
+        if position != size:
+            f.truncate(position)
+
+
+# Ids that already have an event in a previous run's output
+def completed_ids(path: str):
+    done = set()
+    if not path or not os.path.exists(path):
+        return done
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line of an interrupted run
+                continue
+            if "event" in record:
+                done.add(record["id"])
+
+    return done
+
+
+# Groups texts into chunks of up to batch_size texts and batch_chars characters
+def pack(items, batch_size: int = BATCH_SIZE, batch_chars: int = BATCH_CHARS):
+    chunk, size = [], 0
+
+    for item in items:
+        if chunk and (len(chunk) >= batch_size or size + len(item["text"]) > batch_chars):
+            yield chunk
+            chunk, size = [], 0
+
+        chunk.append(item)
+        size += len(item["text"])
+
+    if chunk:
+        yield chunk
+
+
+class BulkExtractor:
+
+    def __init__(self, output, concurrency: int = 8, rpm: float = 0, max_retries: int = MAX_RETRIES,
+                 retry_backoff: float = RETRY_BACKOFF):
+        self.output = output
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rpm)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.counts = {"events": 0, "errors": 0, "requests": 0, "retried": 0}
+        # Texts retried alone run side by side, this keeps the number of model
+        # requests in flight at `concurrency` across all chunks
+        self._requests = asyncio.Semaphore(concurrency)
+
+    def write(self, record):
+        self.output.write(json.dumps(record) + "\n")
+        self.output.flush()
+        self.counts["events" if "event" in record else "errors"] += 1
+
+    async def extract_chunk(self, chunk):
+        if len(chunk) == 1:
+            return {}
+
+        await self.limiter.wait()
+        self.counts["requests"] += 1
+
+        texts = json.dumps([{"id": item["id"], "text": item["text"]} for item in chunk])
+        try:
+            async with self._requests:
+                result = await instrumented_run(batch_calender_agent, texts, stage="calendar_batch")
+        except Exception as e:
+            print(f"Batch of {len(chunk)} failed, retrying per text: {e}", file=sys.stderr, flush=True)
+            return {}
+
+        ids = {item["id"] for item in chunk}
+        return {entry.id: entry.event for entry in result.final_output_as(CalenderEventBatch).events if entry.id in ids}
+
+    # One text on its own, retried with backoff
+    async def extract_one(self, item):
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.wait()
+            self.counts["requests"] += 1
+
+            try:
+                async with self._requests:
+                    result = await instrumented_run(calender_agent, item["text"], stage="calendar_item")
+                return {"id": item["id"], "event": result.final_output_as(CalenderEvent).model_dump()}
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+        return {"id": item["id"], "error": error}
+
+    async def process(self, chunk):
+        events = await self.extract_chunk(chunk)
+
+        for item in chunk:
+            if item["id"] in events:
+                self.write({"id": item["id"], "event": events[item["id"]].model_dump()})
+
+        # Texts the batch request missed are retried on their own
+        missing = [item for item in chunk if item["id"] not in events]
+        if len(chunk) > 1:
+            self.counts["retried"] += len(missing)
+
+        for record in await asyncio.gather(*(self.extract_one(item) for item in missing)):
+            self.write(record)
+
+    # Chunks are packed lazily, so large inputs are never held in memory
+    async def run(self, items, batch_size: int = BATCH_SIZE, batch_chars: int = BATCH_CHARS):
+        chunks = pack(items, batch_size, batch_chars)
+
+        async def worker():
+            for chunk in chunks:
+                await self.process(chunk)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        done = self.counts["events"] + self.counts["errors"]
+        return {
+            **self.counts,
+            "elapsed": elapsed,
+            "throughput": done / elapsed if elapsed else 0.0,
+        }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Extract calendar events from texts in bulk.")
+    parser.add_argument("-i", "--input", help="JSONL or text file with one text per line (default: stdin)")
+    parser.add_argument("-o", "--output", help="JSONL file for events, appended and resumed (default: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Requests running at the same time")
+    parser.add_argument("--rpm", type=float, default=0, help="Max model requests per minute (0: no limit)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Max texts per request")
+    parser.add_argument("--batch-chars", type=int, default=BATCH_CHARS, help="Max characters per request")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES, help="Retries per text")
+    args = parser.parse_args()
+
+    source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    trim_partial_line(args.output)
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    jsonl = not args.input or args.input.endswith((".jsonl", ".json"))
+
+    done = completed_ids(args.output)
+    skipped = 0
+
+    def pending():
+        nonlocal skipped
+        for item in read_texts(source, jsonl):
+            if item["id"] in done:
+                skipped += 1
+                continue
+            yield item
+
+    try:
+        extractor = BulkExtractor(output, args.concurrency, args.rpm, args.retries)
+        summary = await extractor.run(pending(), args.batch_size, args.batch_chars)
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            output.close()
+
+    print(
+        f"\n{summary['events']} events, {summary['errors']} errors, {skipped} already done, "
+        f"{summary['requests']} requests ({summary['retried']} texts retried alone) in {summary['elapsed']:.2f}s "
+        f"({summary['throughput']:.2f} texts/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
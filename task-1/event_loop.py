@@ -0,0 +1,56 @@
+import asyncio
+import atexit
+import threading
+from concurrent.futures import TimeoutError
+
+
+# One long-lived event loop on a background thread. Flask handlers submit
+# coroutines to it instead of calling asyncio.run, so the loop and the HTTP
+# connection pools of the agents SDK are shared between requests
+class BackgroundLoop:
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="background-event-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            atexit.register(self.stop)
+
+    # Run a coroutine on the loop and wait for its result from the calling thread
+    def run(self, coro, timeout: float = None):
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            thread.join()
+            self.loop.close()
+
+
+background_loop = BackgroundLoop()
@@ -3,7 +3,11 @@ from agents import Runner, InputGuardrail, GuardrailFunctionOutput
 from pydantic import BaseModel
 import asyncio
 import os 
+import re
 from  dotenv import load_dotenv
+from agent_common.model_cache import cached_run
+from agent_common.pre_router import PreRouter
+from homework_classifier import load_classifier
 
 # Setup api key 
 load_dotenv()
@@ -37,9 +41,41 @@ history_tutor_agent = Agent(
     " Explain your reasoning at each step and include examples",
 )
 
+# Local classifier decides questions that are clearly homework or clearly not,
+# everything else goes to guradrail_agent. Loaded once, see homework_classifier.py
+homework_classifier = load_classifier()
+audit_tasks = set()
+
+async def llm_homework_check(ctx, input_data):
+    result = await cached_run(guradrail_agent,input_data,context=ctx.context)
+    return result.final_output_as(HomeworkOutput)
+
+# Runs the LLM guardrail on a sample of local decisions to track agreement
+async def audit_decision(ctx, input_data, decision):
+    try:
+        final_output = await llm_homework_check(ctx, input_data)
+        homework_classifier.record_audit(decision, final_output.is_homework)
+    except Exception as e:
+        print(f"Homework classifier audit failed: {e}")
+
 async def homework_guardrail(ctx, agent, input_data):
-    result = await Runner.run(guradrail_agent,input_data,context=ctx.context)
-    final_output = result.final_output_as(HomeworkOutput)
+    decision = None
+    if homework_classifier and isinstance(input_data, str):
+        decision, probability = homework_classifier.decide(input_data)
+
+    if decision is None:
+        final_output = await llm_homework_check(ctx, input_data)
+    else:
+        final_output = HomeworkOutput(
+            is_homework=decision,
+            reasoning=f"Local classifier, p(homework) = {probability:.3f}",
+        )
+
+        if homework_classifier.should_audit():
+            task = asyncio.create_task(audit_decision(ctx, input_data, decision))
+            audit_tasks.add(task)
+            task.add_done_callback(audit_tasks.discard)
+
     tripwire = not final_output.is_homework
 
     if tripwire:
@@ -59,14 +95,53 @@ triage_agent = Agent(
     ],
 )
 
+# Two numbers joined by an operator, like 12 * 4 or 3.5 + 2. A dash or slash
+# between two numbers of 3+ digits is a year range or a date (1939-1945,
+# 2014-2015, 1776/07), not a subtraction or a division
+ARITHMETIC = re.compile(r"(?<![\w./-])(\d+(?:\.\d+)?)\s*([-+*/^×÷])\s*(\d+(?:\.\d+)?)(?![\w./-])")
+
+def is_arithmetic(text):
+    for left, operator, right in ARITHMETIC.findall(text):
+        if operator in "-/" and len(left) >= 3 and len(right) >= 3:
+            continue
+        return True
+    return False
+
+# Clear math or history questions go straight to the tutor and skip the
+# triage turn, the rest is triaged by the LLM. Tutors keep the homework check.
+# Only unambiguous subject words count here: "probability" or "history" alone
+# also show up in weather or product questions, so those go to triage
+triage_router = PreRouter("triage")
+triage_router.add_route(
+    "math", math_tutor_agent.clone(input_guardrails=triage_agent.input_guardrails),
+    r"\b(math|maths|algebra|geometry|calculus|arithmetic|equation|derivative|integral|fraction|"
+    r"quadratic|polynomial|square root|theorem)s?\b",
+    r"\bsolve\b.*(=|\b\d*[a-z]\s*[-+*/^=]|\bfor\s+[a-z]\b)",
+    rules=[is_arithmetic],
+)
+triage_router.add_route(
+    "history", history_tutor_agent.clone(input_guardrails=triage_agent.input_guardrails),
+    r"\bhistory\s+(homework|class|essay|exam|test|quiz|assignment|lesson)s?\b",
+    r"\b(century|centuries|empire|dynasty|civil war|world war|treaty|medieval|colonial|pharaoh|renaissance|"
+    r"french revolution|industrial revolution|american revolution|ancient (egypt|greece|rome|china))s?\b",
+)
+
+async def run_triage(msg):
+    route = triage_router.route(msg)
+    return await Runner.run(route.target if route else triage_agent, msg)
+
 async def main(msg):
     try:
-        result = await Runner.run(triage_agent, msg)
+        result = await run_triage(msg)
         print(result.final_output)
 
     except ValueError as e:
         print(e)
 
+    # Let sampled agreement checks finish before the loop closes
+    if audit_tasks:
+        await asyncio.gather(*audit_tasks, return_exceptions=True)
+
     # msg = "Who is the first"
     # result = await Runner.run(triage_agent, msg)
 
@@ -0,0 +1,234 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Homework classifier settings
+CLASSIFIER_DATA = os.getenv(
+    "HOMEWORK_CLASSIFIER_DATA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "homework_labels.jsonl")
+)
+# Lowest p(not homework) at which a question is rejected without the LLM.
+# Training raises it above every homework question of the held-out folds
+CLASSIFIER_THRESHOLD = float(os.getenv("HOMEWORK_CLASSIFIER_THRESHOLD", 0.98))
+# Lowest p(homework) at which a question is accepted without the LLM.
+# Training raises it above every non-homework question of the held-out folds
+CLASSIFIER_ACCEPT_THRESHOLD = float(os.getenv("HOMEWORK_CLASSIFIER_ACCEPT_THRESHOLD", 0.98))
+# Share of a question's words and word pairs that must have been seen in training
+CLASSIFIER_MIN_COVERAGE = float(os.getenv("HOMEWORK_CLASSIFIER_MIN_COVERAGE", 0.6))
+# Cross-validation folds used to calibrate the thresholds
+CLASSIFIER_FOLDS = int(os.getenv("HOMEWORK_CLASSIFIER_FOLDS", 5))
+# Share of confident decisions also checked by the LLM to measure agreement
+CLASSIFIER_AUDIT_RATE = float(os.getenv("HOMEWORK_CLASSIFIER_AUDIT_RATE", 0.05))
+# Print the skip rate and agreement every N decisions
+CLASSIFIER_LOG_EVERY = int(os.getenv("HOMEWORK_CLASSIFIER_LOG_EVERY", 100))
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _sigmoid(x: float) -> float:
+    if x < -700:
+        return 0.0
+    return 1 / (1 + math.exp(-x))
+
+
+# Words and word pairs, "world war" says more than "world" and "war"
+def features(text: str):
+    words = _WORD.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+# Naive Bayes over TF-IDF weighted word and word pair counts. Trained from a
+# JSONL file with one {"text": "...", "is_homework": true|false} per line.
+#
+# Word and word pair features are correlated, so the probabilities are far
+# too confident. The classifier therefore only decides questions that are
+# clearly homework or clearly not, with a threshold for each side calibrated
+# on held-out folds. Everything in between is left to the LLM guardrail
+class HomeworkClassifier:
+
+    def __init__(self, threshold: float = CLASSIFIER_THRESHOLD, audit_rate: float = CLASSIFIER_AUDIT_RATE,
+                 min_coverage: float = CLASSIFIER_MIN_COVERAGE, accept_threshold: float = CLASSIFIER_ACCEPT_THRESHOLD):
+        self.threshold = threshold
+        self.accept_threshold = accept_threshold
+        self.audit_rate = audit_rate
+        self.min_coverage = min_coverage
+        self.temperature = 1.0
+        self.held_out = {}
+        self.idf = {}
+        self.log_prior = {True: 0.0, False: 0.0}
+        self.log_likelihood = {True: {}, False: {}}
+        self.trained_on = 0
+
+        self.decided = 0
+        self.deferred = 0
+        self.audited = 0
+        self.agreed = 0
+        self._lock = threading.Lock()
+
+    def train(self, examples):
+        examples = [(features(text), bool(label)) for text, label in examples]
+        if not examples or len({label for _, label in examples}) < 2:
+            raise ValueError("Need labelled examples of both homework and non-homework questions")
+
+        document_frequency = Counter()
+        for tokens, _ in examples:
+            document_frequency.update(set(tokens))
+
+        self.idf = {token: math.log((1 + len(examples)) / (1 + df)) + 1 for token, df in document_frequency.items()}
+
+        weights = {True: Counter(), False: Counter()}
+        documents = Counter()
+        for tokens, label in examples:
+            documents[label] += 1
+            for token, count in Counter(tokens).items():
+                weights[label][token] += (1 + math.log(count)) * self.idf[token]
+
+        vocabulary = len(self.idf)
+        for label in (True, False):
+            total = sum(weights[label].values()) + vocabulary
+            self.log_prior[label] = math.log(documents[label] / len(examples))
+            self.log_likelihood[label] = {token: math.log((weights[label][token] + 1) / total) for token in self.idf}
+
+        self.trained_on = len(examples)
+        return self
+
+    # Score every example with a classifier trained on the other folds, then
+    # pick the temperature that best fits those held-out scores. The reject
+    # threshold goes above p(not homework) of every held-out homework question,
+    # the accept threshold above p(homework) of every held-out other question
+    def calibrate(self, examples, folds: int = CLASSIFIER_FOLDS):
+        examples = list(examples)
+        random.Random(0).shuffle(examples)
+
+        held_out = []
+        for fold in range(folds):
+            rest = [example for index, example in enumerate(examples) if index % folds != fold]
+            classifier = HomeworkClassifier(min_coverage=self.min_coverage).train(rest)
+
+            for text, label in examples[fold::folds]:
+                if classifier.coverage(text) >= self.min_coverage:
+                    held_out.append((classifier.log_odds(text), bool(label)))
+
+        def log_loss(temperature):
+            return -sum(math.log(max(_sigmoid(score / temperature if label else -score / temperature), 1e-12))
+                        for score, label in held_out)
+
+        self.temperature = min((t / 2 for t in range(2, 201)), key=log_loss)
+
+        homework_scores = [_sigmoid(score / self.temperature) for score, label in held_out if label]
+        other_scores = [_sigmoid(score / self.temperature) for score, label in held_out if not label]
+        self.threshold = max([self.threshold] + [1 - score for score in homework_scores])
+        self.accept_threshold = max([self.accept_threshold] + other_scores)
+        self.held_out = {
+            'folds': folds,
+            'accepted': sum(score > self.accept_threshold for score in homework_scores) / len(homework_scores) if homework_scores else 0.0,
+            'rejected': sum(1 - score > self.threshold for score in other_scores) / len(other_scores) if other_scores else 0.0,
+        }
+        return self
+
+    @classmethod
+    def from_jsonl(cls, path: str = CLASSIFIER_DATA, **kwargs):
+        examples = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    example = json.loads(line)
+                    examples.append((example["text"], example["is_homework"]))
+
+        return cls(**kwargs).train(examples).calibrate(examples)
+
+    # Share of the question's features seen in training
+    def coverage(self, text: str) -> float:
+        tokens = features(text)
+        if not tokens:
+            return 0.0
+        return sum(token in self.idf for token in tokens) / len(tokens)
+
+    # log P(homework | text) - log P(not homework | text)
+    def log_odds(self, text: str) -> float:
+        scores = {}
+        for label in (True, False):
+            likelihood = self.log_likelihood[label]
+            score = self.log_prior[label]
+            for token in features(text):
+                # Words never seen in training carry no signal
+                if token in self.idf:
+                    score += likelihood[token]
+            scores[label] = score
+
+        return scores[True] - scores[False]
+
+    # P(homework | text), with the log odds scaled down by the calibrated temperature
+    def probability(self, text: str) -> float:
+        return _sigmoid(self.log_odds(text) / self.temperature)
+
+    # True or False when the question is clearly homework or clearly not,
+    # None when the LLM has to decide
+    def decide(self, text: str):
+        probability = self.probability(text)
+
+        decision = None
+        if self.coverage(text) >= self.min_coverage:
+            if probability > self.accept_threshold:
+                decision = True
+            elif 1 - probability > self.threshold:
+                decision = False
+
+        with self._lock:
+            if decision is None:
+                self.deferred += 1
+            else:
+                self.decided += 1
+            self._maybe_log()
+
+        return decision, probability
+
+    def should_audit(self) -> bool:
+        return random.random() < self.audit_rate
+
+    # Compare a confident local decision with what the LLM said
+    def record_audit(self, local: bool, llm: bool):
+        with self._lock:
+            self.audited += 1
+            if local == llm:
+                self.agreed += 1
+            else:
+                print(f"Homework classifier disagreed with the LLM guardrail (local {local}, llm {llm})", flush=True)
+
+    def stats(self):
+        total = self.decided + self.deferred
+        return {
+            'trained_on': self.trained_on,
+            'threshold': self.threshold,
+            'accept_threshold': self.accept_threshold,
+            'temperature': self.temperature,
+            'held_out': self.held_out,
+            'decided': self.decided,
+            'deferred': self.deferred,
+            'skip_rate': self.decided / total if total else 0.0,
+            'audited': self.audited,
+            'agreement': self.agreed / self.audited if self.audited else None,
+        }
+
+    def _maybe_log(self):
+        total = self.decided + self.deferred
+        if CLASSIFIER_LOG_EVERY and total % CLASSIFIER_LOG_EVERY == 0:
+            agreement = f"{self.agreed / self.audited:.1%} of {self.audited}" if self.audited else "n/a"
+            print(f"Homework classifier: {total} questions, skip rate {self.decided / total:.1%}, "
+                  f"agreement with LLM {agreement}", flush=True)
+
+
+# None when there is no training data, then every question goes to the LLM
+def load_classifier(path: str = CLASSIFIER_DATA):
+    if not os.path.exists(path):
+        print(f"Homework classifier disabled, no training data at {path}", flush=True)
+        return None
+
+    return HomeworkClassifier.from_jsonl(path)
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING
+
+load_dotenv()
+
+# Query cache settings
+CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 1000))
+CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 60 * 60))
+NEAR_DUPLICATES = os.getenv("QUERY_CACHE_NEAR_DUPLICATES", "false").lower() == "true"
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "of", "in", "on", "for", "to",
+    "and", "or", "what", "who", "whom", "which", "how", "when", "where", "why",
+    "do", "does", "did", "me", "tell", "about", "please", "can", "you",
+}
+
+_WORD = re.compile(r"\w+")
+
+
+# "What is  Python?" and "what is python" are the same query
+def normalize_query(query: str) -> str:
+    return " ".join(_WORD.findall(query.lower()))
+
+
+# Sorted content words, so reordered or reworded queries share a key
+def token_key(query: str) -> str:
+    tokens = {token for token in _WORD.findall(query.lower()) if token not in STOPWORDS}
+    return " ".join(sorted(tokens))
+
+
+# Fields stored with each result so the Mongo tier can find it again
+def index_fields(query: str) -> dict:
+    return {
+        'normalized_query': normalize_query(query),
+        'token_key': token_key(query),
+        'created_at': datetime.now(timezone.utc),
+    }
+
+
+# Two tier cache in front of generate_response: an in-process LRU first, then
+# the results already stored in the queryResult collection
+class QueryCache:
+
+    def __init__(self, collection, size: int = CACHE_SIZE, ttl: float = CACHE_TTL, near_duplicates: bool = NEAR_DUPLICATES):
+        self.collection = collection
+        self.size = size
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+
+    def _keys(self, query: str):
+        keys = [('exact', normalize_query(query))]
+        tokens = token_key(query)
+        if self.near_duplicates and tokens:
+            keys.append(('tokens', tokens))
+        return keys
+
+    def _get_local(self, query: str):
+        now = time.monotonic()
+
+        with self._lock:
+            for key in self._keys(query):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+
+                result, expires_at = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+
+                self._entries.move_to_end(key)
+                return result
+
+        return None
+
+    def put(self, query: str, result: str, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            for key in self._keys(query):
+                self._entries[key] = (result, expires_at)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _ensure_indexes(self):
+        if not self._indexes_ready:
+            self.collection.create_index([("normalized_query", ASCENDING), ("created_at", DESCENDING)])
+            self.collection.create_index([("token_key", ASCENDING), ("created_at", DESCENDING)])
+            self._indexes_ready = True
+
+    # Stored result and the seconds it has left before it expires
+    def _find_stored(self, query: str):
+        self._ensure_indexes()
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(seconds=self.ttl)
+
+        for key_type, key in self._keys(query):
+            field = 'normalized_query' if key_type == 'exact' else 'token_key'
+            document = self.collection.find_one(
+                {field: key, 'created_at': {'$gte': since}},
+                {'_id': 0, 'result': 1, 'created_at': 1},
+                sort=[('created_at', DESCENDING)],
+            )
+            if document:
+                # pymongo returns naive UTC datetimes unless the client is tz_aware
+                created_at = document['created_at']
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                return document['result'], self.ttl - (now - created_at).total_seconds()
+
+        return None
+
+    # Cached answer for the query, or None when the agents have to run
+    async def get(self, query: str):
+        result = self._get_local(query)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        try:
+            stored = await asyncio.to_thread(self._find_stored, query)
+        except Exception as e:
+            print(f"Error reading query cache from MongoDB: {e}", flush=True)
+            stored = None
+
+        if stored is not None:
+            # Kept in memory only for the time the stored result has left
+            result, remaining = stored
+            self.mongo_hits += 1
+            self.put(query, result, ttl=max(remaining, 0))
+            return result
+
+        self.misses += 1
+        return None
+
+    def stats(self):
+        lookups = self.memory_hits + self.mongo_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size': self.size,
+            'ttl_seconds': self.ttl,
+            'near_duplicates': self.near_duplicates,
+            'memory_hits': self.memory_hits,
+            'mongo_hits': self.mongo_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.mongo_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,139 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError, PyMongoError
+
+load_dotenv()
+
+# Writer settings
+BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", 50))
+FLUSH_INTERVAL = float(os.getenv("MONGO_FLUSH_INTERVAL", 1.0))
+MAX_RETRIES = int(os.getenv("MONGO_MAX_RETRIES", 3))
+RETRY_BACKOFF = float(os.getenv("MONGO_RETRY_BACKOFF", 0.5))
+
+DUPLICATE_KEY_ERROR = 11000
+
+_STOP = object()
+
+
+# Stores {query, result} documents from a background thread so the /search
+# response never waits for Mongo. Documents are grouped into insert_many
+# batches and retried with backoff on errors
+class QueryResultWriter:
+
+    def __init__(self, collection, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 max_retries: int = MAX_RETRIES, retry_backoff: float = RETRY_BACKOFF):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.written = 0
+        self.retries = 0
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-result-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    # Queue a document and return right away
+    def write(self, document: dict):
+        self.start()
+        self._queue.put(document)
+
+    # Flush what is queued and stop the writer thread
+    def stop(self, timeout: float = 10):
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                try:
+                    document = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+                if document is _STOP:
+                    stopping = True
+                    break
+                batch.append(document)
+
+            if batch:
+                self._insert(batch)
+
+    def _insert(self, batch):
+        # _ids sent by earlier attempts, pymongo sets them on the documents
+        sent = set()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.collection.insert_many(batch, ordered=False)
+                self.written += len(batch)
+                return
+
+            except BulkWriteError as e:
+                failed, rejected = [], []
+                for error in e.details.get('writeErrors', []):
+                    document = batch[error['index']]
+                    if error.get('code') != DUPLICATE_KEY_ERROR:
+                        failed.append(document)
+                    elif document.get('_id') is None or document['_id'] not in sent:
+                        # Clashes with a document this writer never sent, retrying will not help
+                        rejected.append(document)
+                    # else: stored by an earlier attempt whose reply was lost
+
+                self.written += len(batch) - len(failed) - len(rejected)
+
+                if rejected:
+                    self.dropped += len(rejected)
+                    print(f"Error storing {len(rejected)} results in MongoDB, duplicate key: "
+                          f"{[document.get('query') for document in rejected]}", flush=True)
+
+                if not failed:
+                    return
+
+                if attempt == self.max_retries:
+                    self.dropped += len(failed)
+                    print(f"Error storing {len(failed)} results in MongoDB: {e}", flush=True)
+                    return
+
+                sent.update(document.get('_id') for document in batch)
+                batch = failed
+
+            except PyMongoError as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(batch)
+                    print(f"Error storing {len(batch)} results in MongoDB: {e}", flush=True)
+                    return
+
+                sent.update(document.get('_id') for document in batch)
+
+            self.retries += 1
+            time.sleep(self.retry_backoff * 2 ** attempt)
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'retries': self.retries,
+            'dropped': self.dropped,
+        }
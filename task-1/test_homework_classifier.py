@@ -0,0 +1,59 @@
+import pytest
+from homework_classifier import HomeworkClassifier, CLASSIFIER_THRESHOLD, CLASSIFIER_ACCEPT_THRESHOLD
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return HomeworkClassifier.from_jsonl()
+
+
+# Questions the uncalibrated classifier let through as homework with p > 0.998
+@pytest.mark.parametrize("question", [
+    "Who is the CEO of Tesla?",
+    "What is the capital of France?",
+    "Who is the president of the United States today?",
+])
+def test_never_passes_a_question_without_the_llm(classifier, question):
+    decision, _ = classifier.decide(question)
+    assert decision is not True
+
+
+@pytest.mark.parametrize("question", [
+    "How do I fix my python code?",
+    "What caused World War I?",
+])
+def test_possible_homework_goes_to_the_llm(classifier, question):
+    decision, _ = classifier.decide(question)
+    assert decision is None
+
+
+@pytest.mark.parametrize("question", [
+    "Solve for x: 2x + 3 = 9",
+    "Explain the causes of the Great Depression for my essay",
+    "What is the derivative of x^2 for my calculus homework?",
+])
+def test_clear_homework_is_accepted_locally(classifier, question):
+    decision, _ = classifier.decide(question)
+    assert decision is True
+
+
+@pytest.mark.parametrize("question", [
+    "Recommend a good restaurant near me",
+    "How do I reset my router password?",
+])
+def test_clear_non_homework_is_rejected_locally(classifier, question):
+    decision, _ = classifier.decide(question)
+    assert decision is False
+
+
+def test_unknown_words_go_to_the_llm(classifier):
+    decision, _ = classifier.decide("Quelle est la capitale de l'Australie ?")
+    assert decision is None
+
+
+def test_thresholds_are_calibrated_on_held_out_folds(classifier):
+    assert classifier.threshold >= CLASSIFIER_THRESHOLD
+    assert classifier.accept_threshold >= CLASSIFIER_ACCEPT_THRESHOLD
+    assert classifier.held_out['accepted'] > 0.5
+    assert classifier.temperature > 1
+    assert classifier.held_out['folds'] > 1
@@ -0,0 +1,48 @@
+import importlib.util
+import os
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# first-agent.py is not an importable module name
+spec = importlib.util.spec_from_file_location(
+    "first_agent", os.path.join(os.path.dirname(os.path.abspath(__file__)), "first-agent.py")
+)
+first_agent = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(first_agent)
+
+
+def route_name(text):
+    route = first_agent.triage_router.route(text)
+    return route.name if route else None
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What is 12 * 4?", "math"),
+    ("What is 3.5 + 2?", "math"),
+    ("Solve for x: 3x + 5 = 20", "math"),
+    ("Can you solve 2y - 4 = 10", "math"),
+    ("Help me with my algebra homework", "math"),
+    ("What caused World War I?", "history"),
+    ("Explain the French Revolution", "history"),
+    ("I need help with my history homework", "history"),
+])
+def test_clear_questions_go_to_the_tutor(question, expected):
+    assert route_name(question) == expected
+
+
+@pytest.mark.parametrize("question", [
+    "What happened in Europe between 1939-1945?",
+    "Who won the 2014-2015 season?",
+    "Explain what a noun is",
+    "Can you explain the water cycle and solve my confusion?",
+    "What's the probability of rain tomorrow?",
+    "Tell me the history of the iPhone",
+    "What happened on 1776/07/04?",
+])
+def test_misleading_questions_go_to_triage(question):
+    assert route_name(question) is None
+
+
+def test_year_range_with_history_words_goes_to_history():
+    assert route_name("Why did the Roman empire decline between 200-476?") == "history"
@@ -1,15 +1,100 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from task_2 import create_new_task, get_status, collection, run_task
-import asyncio
+from task_2 import (
+    create_new_task, get_status, result_store, run_task, sessions,
+    checkpoints, resume_task, recover_tasks, unschedule, TaskNotResumableError,
+)
+from scheduler import TaskScheduler, QueueFullError
+from http_client import start_http_client, close_http_client
+from scrape_cache import scrape_cache
+from session_store import SessionStoreFullError
+from progress import progress
+from dedup import QueryRegistry, normalize_query
+from agent_common.agent_metrics import render_metrics, CONTENT_TYPE
+from typing import List
+from contextlib import asynccontextmanager, aclosing
+import json, os
 import uvicorn
 
-app = FastAPI()
+scheduler = TaskScheduler(run_task)
+
+# Reschedule tasks that were queued or running when the app last stopped
+RECOVER_ON_STARTUP = os.getenv("RECOVER_ON_STARTUP", "true").lower() == "true"
+
+async def recover_interrupted_tasks():
+    recovered = 0
+
+    async with aclosing(recover_tasks()) as tasks:
+        async for task_id in tasks:
+            try:
+                scheduler.submit(task_id)
+            except QueueFullError as e:
+                # This and the remaining tasks stay unfinished in their
+                # checkpoints for the next start or a manual resume
+                unschedule(task_id, str(e))
+                print("Queue full, remaining interrupted tasks not scheduled", flush=True)
+                break
+            query_registry.register(sessions[task_id]['query'], task_id)
+            recovered += 1
+
+    if recovered:
+        print(f"Recovered {recovered} interrupted tasks", flush=True)
+
+# Start the shared resources with the app and stop them on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await result_store.start()
+    await checkpoints.start()
+    await scheduler.start()
+    if RECOVER_ON_STARTUP:
+        await recover_interrupted_tasks()
+    yield
+    await scheduler.stop()
+    await checkpoints.stop()
+    await result_store.stop()
+    await close_http_client()
+    scrape_cache.close()
+
+app = FastAPI(lifespan=lifespan)
+
+# Max number of queries accepted by POST /tasks
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 50))
+
+query_registry = QueryRegistry(sessions)
 
 # Pydantic model for request validation
 class TaskRequest(BaseModel):
     query: str
 
+class BatchTaskRequest(BaseModel):
+    queries: List[str]
+
+def server_busy(e: Exception):
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "5"},
+    )
+
+# Attach to the pipeline of an identical query or create and queue a new task
+def start_or_attach(query: str):
+    task_id = query_registry.lookup(query)
+
+    if task_id:
+        return task_id, True
+
+    try:
+        task_id = create_new_task(query)
+    except SessionStoreFullError as e:
+        raise server_busy(e)
+
+    scheduler.submit(task_id)
+    query_registry.register(query, task_id)
+
+    return task_id, False
+
 # Create task endpoint
 @app.post("/task", status_code=status.HTTP_200_OK)
 async def task_create(task_request: TaskRequest):
@@ -18,49 +103,223 @@ async def task_create(task_request: TaskRequest):
     if not query:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Query is required.")
 
-    # Create a new task
-    task_id = create_new_task(query)
+    # Reject before creating the task when there is no room in the queue
+    if not query_registry.lookup(query, count=False):
+        try:
+            scheduler.check_capacity()
+        except QueueFullError as e:
+            raise server_busy(e)
 
-    # Scheduling the background task
-    asyncio.create_task(run_task(task_id))
+    task_id, deduplicated = start_or_attach(query)
 
     response = {
         'success': True,
         'query': query,
         'task_id': task_id,
-        'status': get_status(task_id)
+        'status': get_status(task_id),
+        'deduplicated': deduplicated
     }
 
     return response
 
+# Create many tasks in one request
+@app.post("/tasks", status_code=status.HTTP_200_OK)
+async def tasks_create(batch_request: BatchTaskRequest):
+    queries = batch_request.queries
+
+    if not queries or not all(queries):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Queries are required.")
+
+    if len(queries) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SIZE} queries per request.",
+        )
+
+    # The whole batch is rejected when its new pipelines do not fit in the queue
+    new_queries = {
+        normalize_query(query) for query in queries
+        if not query_registry.lookup(query, count=False)
+    }
+    try:
+        scheduler.check_capacity(len(new_queries))
+    except QueueFullError as e:
+        raise server_busy(e)
+
+    tasks = []
+    for query in queries:
+        task_id, deduplicated = start_or_attach(query)
+        tasks.append({
+            'query': query,
+            'task_id': task_id,
+            'status': get_status(task_id),
+            'deduplicated': deduplicated
+        })
+
+    return {
+        'success': True,
+        'tasks': tasks
+    }
+
+# Queue depth and worker usage
+@app.get("/queue", status_code=status.HTTP_200_OK)
+async def queue_stats():
+    return scheduler.stats()
+
+# Scrape cache hit/miss counters
+@app.get("/cache", status_code=status.HTTP_200_OK)
+async def cache_stats():
+    return scrape_cache.stats()
+
+# Pending and written result batches, saved stage checkpoints
+@app.get("/storage", status_code=status.HTTP_200_OK)
+async def storage_stats():
+    return {**result_store.stats(), 'checkpoints': checkpoints.stats()}
+
+# Session store size and memory usage
+@app.get("/sessions", status_code=status.HTTP_200_OK)
+async def session_stats():
+    return {**sessions.stats(), 'dedup': query_registry.stats()}
+
+# Agent, model and tool metrics in Prometheus text format
+@app.get("/metrics", status_code=status.HTTP_200_OK)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 # Check task status endpoint
 @app.get("/task/{task_id}", status_code=status.HTTP_200_OK)
 async def check_task_status(task_id: str):
     task_status = get_status(task_id)
 
-    if not task_status:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
-    
-    elif task_status != "Done":
+    if task_status and task_status != "Done":
         return {
             'status': task_status
         }
-    
-    else:
-        result = collection.find_one({"task_id": task_id})
 
-        if not result:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task result not found in database.")
+    # Finished tasks are evicted from the session store, their results stay in Mongo
+    result = await result_store.find_result(task_id)
+
+    if not result:
+        if not task_status:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
 
-        response = {
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task result not found in database.")
+
+    response = {
+        'task_id': task_id,
+        'status': "Done",
+        'query': result['query'],
+        'scraped_url': result['scraped_url'],
+        'tutorial': result['tutorial']
+    }
+
+    return response
+
+# Restart a failed or interrupted task from its last completed stage
+@app.post("/task/{task_id}/resume", status_code=status.HTTP_200_OK)
+async def task_resume(task_id: str):
+    try:
+        scheduler.check_capacity()
+    except QueueFullError as e:
+        raise server_busy(e)
+
+    try:
+        resumed = await resume_task(task_id)
+    except TaskNotResumableError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except SessionStoreFullError as e:
+        raise server_busy(e)
+
+    if not resumed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
+
+    # The queue can fill up while the checkpoint is loaded
+    try:
+        scheduler.submit(task_id)
+    except QueueFullError as e:
+        unschedule(task_id, str(e))
+        raise server_busy(e)
+
+    return {
+        'success': True,
+        'task_id': task_id,
+        'status': get_status(task_id),
+        'completed_stage': sessions[task_id].get('completed_stage'),
+    }
+
+# Progress events of a task: replayed from its session while it is in memory,
+# otherwise rebuilt from the stored result in Mongo
+async def task_events(task_id: str):
+    session = sessions.get(task_id)
+
+    if session:
+        return progress.subscribe(task_id, session['events'])
+
+    result = await result_store.find_result(task_id)
+
+    if not result:
+        return None
+
+    async def stored_result():
+        yield {
             'task_id': task_id,
-            'status': task_status,
+            'status': "Done",
+            'final': True,
             'query': result['query'],
             'scraped_url': result['scraped_url'],
             'tutorial': result['tutorial']
         }
 
-        return response
+    return stored_result()
+
+# Stream task progress with Server-Sent Events
+@app.get("/task/{task_id}/events")
+async def stream_task_events(task_id: str):
+    events = await task_events(task_id)
+
+    if events is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
+
+    async def event_stream():
+        try:
+            async for event in events:
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                event_name = "done" if event['final'] else "status"
+                yield f"event: {event_name}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Stream task progress over a WebSocket
+@app.websocket("/ws/task/{task_id}")
+async def task_events_websocket(websocket: WebSocket, task_id: str):
+    await websocket.accept()
+    events = await task_events(task_id)
+
+    if events is None:
+        await websocket.close(code=4404, reason="Task not found.")
+        return
+
+    try:
+        async for event in events:
+            if event is not None:
+                await websocket.send_json(event)
+
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        pass
+
+    finally:
+        await events.aclose()
 
 # Runing FastAPI app
 if __name__ == "__main__":
@@ -0,0 +1,67 @@
+"""Compare the streaming paragraph extractor with the old BeautifulSoup path.
+
+Usage: python bench_html_extractor.py [saved_page.html ...]
+Without arguments a synthetic multi-megabyte page is used.
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from html_extractor import extract_paragraphs
+
+CHUNK_SIZE = 64 * 1024
+ROUNDS = 5
+
+
+def synthetic_page(paragraphs: int = 20000) -> bytes:
+    body = "".join(
+        f"<div class='row'><p>Paragraph {i} with <b>some</b> inline &amp; markup text.</p>"
+        f"<span>noise {i}</span></div>"
+        for i in range(paragraphs)
+    )
+    return f"<html><head><title>bench</title></head><body>{body}</body></html>".encode()
+
+
+# Old path: buffer everything and build the full tree
+def bs4_extract(page: bytes) -> str:
+    soup = BeautifulSoup(page.decode("utf-8", errors="replace"), "html.parser")
+    return "\n".join(p.get_text() for p in soup.find_all("p"))
+
+
+async def chunked(page: bytes):
+    for i in range(0, len(page), CHUNK_SIZE):
+        yield page[i:i + CHUNK_SIZE]
+
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = func()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms   peak {peak / 1024 / 1024:7.1f} MiB")
+    return result
+
+
+def bench_page(name: str, page: bytes):
+    print(f"\n{name}: {len(page) / 1024 / 1024:.1f} MiB")
+
+    measure("beautifulsoup (full parse)", lambda: bs4_extract(page))
+    measure("streaming (no budget)", lambda: asyncio.run(extract_paragraphs(chunked(page), max_chars=sys.maxsize)))
+    result = measure("streaming (default budget)", lambda: asyncio.run(extract_paragraphs(chunked(page))))
+
+    print(f"  budgeted run read {result.bytes_read} bytes, {result.paragraphs} paragraphs, "
+          f"parse time {result.parse_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with open(path, "rb") as f:
+                bench_page(path, f.read())
+    else:
+        bench_page("synthetic page", synthetic_page())
@@ -0,0 +1,100 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pymongo import ASCENDING
+
+# Pipeline stages in the order run_task runs them
+STAGES = ("browse_web", "find_and_scrape_web", "create_and_store")
+
+# Stage outputs copied back into the session when a task is resumed
+RESTORED_FIELDS = ("agent1_result", "agent2_result", "scraped_url", "agent3_result")
+
+# Tasks in these states were queued or running when the process stopped
+UNFINISHED_STATES = ("queued", "running")
+
+
+def stage_completed(completed_stage, stage: str) -> bool:
+    return completed_stage is not None and STAGES.index(completed_stage) >= STAGES.index(stage)
+
+
+# Per task checkpoint document: query, state (queued/running/done/failed),
+# last completed stage and that stage's outputs. Writes go through a single
+# thread, so they reach Mongo in the order they were made
+class CheckpointStore:
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.stages_saved = 0
+        self.resumed = 0
+        self.errors = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoints")
+
+    def _submit(self, func, *args, **kwargs):
+        return self._executor.submit(func, *args, **kwargs)
+
+    async def _run(self, func, *args, **kwargs):
+        return await asyncio.wrap_future(self._submit(func, *args, **kwargs))
+
+    async def start(self):
+        await self._run(self.collection.create_index, [("task_id", ASCENDING)], unique=True)
+        await self._run(self.collection.create_index, [("state", ASCENDING)])
+
+    async def stop(self):
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    def _update(self, task_id: str, fields: dict, on_insert: dict = None, remove=()):
+        update = {'$set': {**fields, 'updated_at': datetime.now(timezone.utc)}}
+        if on_insert:
+            update['$setOnInsert'] = on_insert
+        if remove:
+            update['$unset'] = {field: "" for field in remove}
+
+        try:
+            self.collection.update_one({'task_id': task_id}, update, upsert=True)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error saving checkpoint of task {task_id}: {e}", flush=True)
+
+    # New task, written in the background so task creation does not wait on Mongo
+    def created(self, task_id: str, query: str):
+        self._submit(self._update, task_id, {}, {
+            'query': query,
+            'state': 'queued',
+            'completed_stage': None,
+            'created_at': datetime.now(timezone.utc),
+        })
+
+    # Outputs of a finished stage, resolves once they are stored
+    async def save_stage(self, task_id: str, stage: str, **outputs):
+        await self._run(self._update, task_id, {**outputs, 'completed_stage': stage, 'state': 'running'})
+        self.stages_saved += 1
+
+    # Outputs of a stage that has not completed yet, restored on resume
+    async def save_outputs(self, task_id: str, **outputs):
+        await self._run(self._update, task_id, outputs)
+
+    async def mark(self, task_id: str, state: str, error: str = None):
+        fields = {'state': state}
+        if error is not None:
+            fields['error'] = error
+        await self._run(self._update, task_id, fields)
+
+    # Called once the result is stored. A finished task is never resumed, so
+    # the error of an earlier attempt and the stage outputs go
+    async def finish(self, task_id: str):
+        await self._run(self._update, task_id, {'state': 'done'}, remove=('error',) + RESTORED_FIELDS)
+
+    async def load(self, task_id: str):
+        return await self._run(self.collection.find_one, {'task_id': task_id}, {'_id': 0})
+
+    async def unfinished(self):
+        return await self._run(
+            lambda: list(self.collection.find({'state': {'$in': list(UNFINISHED_STATES)}}, {'_id': 0}))
+        )
+
+    def stats(self):
+        return {
+            'stages_saved': self.stages_saved,
+            'resumed': self.resumed,
+            'errors': self.errors,
+        }
@@ -0,0 +1,62 @@
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Finished tasks are reused for identical queries for this many seconds
+DEDUP_WINDOW = float(os.getenv("DEDUP_WINDOW", 5 * 60))
+
+
+# Same question with different casing, spacing or trailing punctuation
+# should map to the same pipeline
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+# Maps normalized queries to the task running (or recently finished) for them,
+# so identical queries share one pipeline instead of starting another one
+class QueryRegistry:
+
+    def __init__(self, sessions, window: float = DEDUP_WINDOW):
+        self.sessions = sessions
+        self.window = window
+        self.attached = 0
+        self._tasks = {}
+
+    # Task id to attach to, or None if a new pipeline is needed
+    def lookup(self, query: str, count: bool = True):
+        key = normalize_query(query)
+        task_id = self._tasks.get(key)
+
+        if task_id is None:
+            return None
+
+        session = self.sessions.get(task_id)
+
+        if session is None or session['status'].startswith("Error"):
+            del self._tasks[key]
+            return None
+
+        finished_at = session.get('finished_at')
+        if finished_at is not None and time.time() - finished_at > self.window:
+            del self._tasks[key]
+            return None
+
+        if count:
+            self.attached += 1
+        return task_id
+
+    def register(self, query: str, task_id: str):
+        # Forget queries whose sessions were already evicted
+        if len(self._tasks) > len(self.sessions):
+            self._tasks = {key: value for key, value in self._tasks.items() if value in self.sessions}
+
+        self._tasks[normalize_query(query)] = task_id
+
+    def stats(self):
+        return {
+            'tracked_queries': len(self._tasks),
+            'attached': self.attached,
+            'window_seconds': self.window,
+        }
@@ -0,0 +1,145 @@
+import codecs
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+from html.parser import HTMLParser
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Stop extracting once this many characters of paragraph text are collected
+MAX_CHARS = int(os.getenv("SCRAPE_MAX_CHARS", 20000))
+
+# Block tags that implicitly end an open <p>
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "div", "dl", "fieldset", "footer",
+    "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "nav",
+    "ol", "p", "pre", "section", "table", "ul",
+}
+
+# Tags whose content is never page text, even inside a <p>
+SKIPPED_TAGS = {"script", "style"}
+
+
+@dataclass
+class ExtractResult:
+    text: str
+    paragraphs: int
+    bytes_read: int
+    parse_time: float
+    truncated: bool
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    cached: bool = False
+
+
+# Event based parser that only keeps the text inside <p> tags
+class ParagraphParser(HTMLParser):
+
+    def __init__(self, max_chars: int = MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.paragraphs = []
+        self.char_count = 0
+        self.done = False
+        self._in_paragraph = False
+        self._skipping = None
+        self._current = []
+        self._current_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skipping = tag
+            return
+
+        if tag in BLOCK_TAGS and self._in_paragraph:
+            self._close_paragraph()
+
+        if tag == "p":
+            self._in_paragraph = True
+            self._current = []
+            self._current_chars = 0
+
+    def handle_endtag(self, tag):
+        if tag == self._skipping:
+            self._skipping = None
+            return
+
+        if tag in BLOCK_TAGS and self._in_paragraph:
+            self._close_paragraph()
+
+    def handle_data(self, data):
+        if not self._in_paragraph or self.done or self._skipping:
+            return
+
+        self._current.append(data)
+        self._current_chars += len(data)
+
+        # Stop as soon as the budget is used up, also inside a <p> that never closes
+        if self.char_count + self._current_chars >= self.max_chars:
+            self._close_paragraph()
+
+    def close(self):
+        super().close()
+        if self._in_paragraph:
+            self._close_paragraph()
+
+    def _close_paragraph(self):
+        self._in_paragraph = False
+        if self.done:
+            return
+
+        text = "".join(self._current)
+        self._current = []
+        self._current_chars = 0
+
+        remaining = self.max_chars - self.char_count
+        if len(text) >= remaining:
+            text = text[:remaining]
+            self.done = True
+
+        self.paragraphs.append(text)
+        self.char_count += len(text)
+
+    def text(self):
+        return "\n".join(self.paragraphs)
+
+
+# Parse paragraph text from an async stream of byte chunks, stops early once
+# max_chars is reached or max_bytes have been read
+async def extract_paragraphs(chunks, encoding: str = "utf-8", max_chars: int = MAX_CHARS, max_bytes: int = None) -> ExtractResult:
+    parser = ParagraphParser(max_chars)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    bytes_read = 0
+    parse_time = 0.0
+    truncated = False
+
+    async for chunk in chunks:
+        bytes_read += len(chunk)
+        start = time.perf_counter()
+        parser.feed(decoder.decode(chunk))
+        parse_time += time.perf_counter() - start
+
+        if parser.done:
+            truncated = True
+            break
+
+        if max_bytes is not None and bytes_read >= max_bytes:
+            truncated = True
+            break
+
+    start = time.perf_counter()
+    if not truncated:
+        parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    parse_time += time.perf_counter() - start
+
+    return ExtractResult(
+        text=parser.text(),
+        paragraphs=len(parser.paragraphs),
+        bytes_read=bytes_read,
+        parse_time=parse_time,
+        truncated=truncated or parser.done,
+    )
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from dotenv import load_dotenv
+from html_extractor import extract_paragraphs, ExtractResult, MAX_CHARS
+
+load_dotenv()
+
+# HTTP client settings
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 15))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 6))
+MAX_RESPONSE_BYTES = int(os.getenv("HTTP_MAX_RESPONSE_BYTES", 5 * 1024 * 1024))
+USE_HTTP2 = os.getenv("HTTP_USE_HTTP2", "true").lower() == "true"
+
+
+_client = None
+_host_semaphores = {}
+
+
+# HTTP/2 needs the optional h2 package, fall back to HTTP/1.1 without it
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# Create the shared client, called once at app startup
+async def start_http_client():
+    global _client
+
+    if _client is not None:
+        return _client
+
+    _client = httpx.AsyncClient(
+        http2=USE_HTTP2 and _http2_available(),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        follow_redirects=True,
+    )
+    return _client
+
+
+# Close the shared client, called once at app shutdown
+async def close_http_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client():
+    if _client is None:
+        raise RuntimeError("HTTP client is not started, call start_http_client() first.")
+    return _client
+
+
+# Cap the number of open requests to the same host
+@asynccontextmanager
+async def host_limit(url: str):
+    host = urlsplit(url).netloc.lower()
+
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+
+    async with _host_semaphores[host]:
+        yield
+
+
+# Stream a page with the shared client and pull out its paragraph text,
+# reading at most max_bytes of the body. Returns None when a conditional
+# request (If-None-Match / If-Modified-Since) answers 304 Not Modified
+async def fetch_paragraphs(url: str, max_chars: int = MAX_CHARS, max_bytes: int = MAX_RESPONSE_BYTES, headers: dict = None) -> Optional[ExtractResult]:
+    client = get_http_client()
+
+    async with host_limit(url):
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return None
+
+            response.raise_for_status()
+            encoding = response.charset_encoding or "utf-8"
+
+            result = await extract_paragraphs(response.aiter_bytes(), encoding, max_chars, max_bytes)
+            result.etag = response.headers.get("etag")
+            result.last_modified = response.headers.get("last-modified")
+
+            return result
@@ -0,0 +1,133 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from agent_common.memory_collection import DUPLICATE_KEY_ERROR
+
+load_dotenv()
+
+# Result writer settings
+BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", 50))
+FLUSH_INTERVAL = float(os.getenv("MONGO_FLUSH_INTERVAL", 0.5))
+MONGO_THREADS = int(os.getenv("MONGO_THREADS", 4))
+
+# Fields returned to clients, skips _id and anything else stored with the result
+RESULT_FIELDS = ("task_id", "query", "scraped_url", "tutorial")
+RESULT_PROJECTION = {"_id": 0, **{field: 1 for field in RESULT_FIELDS}}
+
+
+# Writes task results in insert_many batches and reads them back without
+# blocking the event loop. Mongo calls run on a dedicated thread pool
+class ResultStore:
+
+    def __init__(self, collection, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.batches_written = 0
+        self.documents_written = 0
+        self._executor = ThreadPoolExecutor(max_workers=MONGO_THREADS, thread_name_prefix="mongo")
+        self._pending = []
+        self._flush_task = None
+        self._wakeup = None
+        self._stopping = False
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def start(self):
+        # task-1 stores {query, result} documents without a task_id in the same
+        # collection, so only documents that have one are part of the index
+        await self._run(
+            self.collection.create_index, [("task_id", ASCENDING)],
+            unique=True, partialFilterExpression={"task_id": {"$exists": True}},
+        )
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        # Let the flush loop finish its current batch, then write what is left
+        if self._flush_task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    # Queue a result for the next batch. Resolves once it is stored in Mongo
+    async def save(self, document: dict):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((document, future))
+
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+        if self._flush_task is None:
+            await self.flush()
+
+        return await future
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        documents = [document for document, _ in batch]
+
+        try:
+            await self._run(self.collection.insert_many, documents, ordered=False)
+            failed = {}
+
+        except BulkWriteError as e:
+            # Results already stored for the same task are not an error
+            failed = {
+                error['index']: error['errmsg'] for error in e.details.get('writeErrors', [])
+                if error.get('code') != DUPLICATE_KEY_ERROR
+            }
+
+        except Exception as e:
+            failed = {index: str(e) for index in range(len(batch))}
+
+        self.batches_written += 1
+        self.documents_written += len(batch) - len(failed)
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(RuntimeError(failed[index]))
+            else:
+                future.set_result(True)
+
+    async def _flush_loop(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self.flush()
+
+    # Stored result of a task, including results still waiting for their batch
+    async def find_result(self, task_id: str):
+        for document, _ in self._pending:
+            if document.get('task_id') == task_id:
+                return {key: document[key] for key in RESULT_FIELDS if key in document}
+
+        return await self._run(self.collection.find_one, {"task_id": task_id}, RESULT_PROJECTION)
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'batch_size': self.batch_size,
+            'flush_interval_seconds': self.flush_interval,
+            'batches_written': self.batches_written,
+            'documents_written': self.documents_written,
+        }
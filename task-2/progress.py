@@ -0,0 +1,55 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seconds between keep-alive messages on an idle stream
+HEARTBEAT_INTERVAL = float(os.getenv("PROGRESS_HEARTBEAT_INTERVAL", 15))
+
+
+# Pushes task progress events to every client streaming that task
+class ProgressBroker:
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def publish(self, task_id: str, event: dict):
+        for queue in self._subscribers.get(task_id, ()):
+            queue.put_nowait(event)
+
+    def subscriber_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    # Replay the events the task already produced, then yield new ones until
+    # the final event. Yields None when nothing happened for heartbeat seconds
+    async def subscribe(self, task_id: str, history: list, heartbeat: float = HEARTBEAT_INTERVAL):
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(task_id, set()).add(queue)
+
+        try:
+            for event in list(history):
+                yield event
+                if event.get('final'):
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                yield event
+                if event.get('final'):
+                    return
+
+        finally:
+            queues = self._subscribers.get(task_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[task_id]
+
+
+progress = ProgressBroker()
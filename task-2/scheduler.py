@@ -0,0 +1,104 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Scheduler settings
+WORKER_COUNT = int(os.getenv("TASK_WORKERS", 4))
+MAX_QUEUE_SIZE = int(os.getenv("TASK_QUEUE_SIZE", 100))
+
+# Max number of tasks allowed inside each pipeline stage at once
+STAGE_LIMITS = {
+    "browse_web": int(os.getenv("BROWSE_WEB_CONCURRENCY", 4)),
+    "find_and_scrape_web": int(os.getenv("SCRAPE_WEB_CONCURRENCY", 4)),
+    "create_and_store": int(os.getenv("CREATE_AND_STORE_CONCURRENCY", 2)),
+}
+
+stage_semaphores = {name: asyncio.Semaphore(limit) for name, limit in STAGE_LIMITS.items()}
+stage_active = {name: 0 for name in STAGE_LIMITS}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# Limit how many tasks run a pipeline stage at the same time
+@asynccontextmanager
+async def stage_limit(stage: str):
+    async with stage_semaphores[stage]:
+        stage_active[stage] += 1
+        try:
+            yield
+        finally:
+            stage_active[stage] -= 1
+
+
+class TaskScheduler:
+
+    def __init__(self, runner, worker_count: int = WORKER_COUNT, max_queue_size: int = MAX_QUEUE_SIZE):
+        self.runner = runner
+        self.worker_count = worker_count
+        self.max_queue_size = max_queue_size
+        self.queue = None
+        self.workers = []
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.workers = [
+            asyncio.create_task(self._worker(), name=f"task-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    # Raise QueueFullError when count new tasks would not fit in the queue
+    def check_capacity(self, count: int = 1):
+        if self.queue.qsize() + count > self.max_queue_size:
+            self.rejected += 1
+            raise QueueFullError(f"Task queue is full ({self.max_queue_size} tasks waiting).")
+
+    # Add a task to the queue, raises QueueFullError when there is no room left
+    def submit(self, task_id: str):
+        try:
+            self.queue.put_nowait(task_id)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"Task queue is full ({self.max_queue_size} tasks waiting).")
+
+    async def _worker(self):
+        while True:
+            task_id = await self.queue.get()
+            self.running += 1
+
+            try:
+                await self.runner(task_id)
+            except Exception as e:
+                print(f"Error occur while running task {task_id}: {e}", flush=True)
+            finally:
+                self.running -= 1
+                self.completed += 1
+                self.queue.task_done()
+
+    def stats(self):
+        return {
+            'workers': self.worker_count,
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'max_queue_size': self.max_queue_size,
+            'running': self.running,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'stages': {
+                name: {'active': stage_active[name], 'limit': limit}
+                for name, limit in STAGE_LIMITS.items()
+            },
+        }
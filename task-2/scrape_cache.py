@@ -0,0 +1,189 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+from html_extractor import ExtractResult
+from http_client import fetch_paragraphs
+
+load_dotenv()
+
+# Scrape cache settings
+CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", "scrape_cache.sqlite3")
+CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", 24 * 60 * 60))
+CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+# Same page should map to the same key: lower case scheme/host, no default
+# port, no fragment, sorted query string without tracking parameters
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    )
+
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+# Persistent url -> paragraph text cache with TTL and LRU eviction by total size
+class ScrapeCache:
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_cache (
+                url TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_scrape_cache_access ON scrape_cache (last_access)")
+        self._db.commit()
+
+    def get(self, url: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text, etag, last_modified, fetched_at FROM scrape_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._db.execute("UPDATE scrape_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+        text, etag, last_modified, fetched_at = row
+        return {'text': text, 'etag': etag, 'last_modified': last_modified, 'fetched_at': fetched_at}
+
+    def put(self, url: str, text: str, etag: str = None, last_modified: str = None):
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO scrape_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, text, etag, last_modified, now, now, len(text.encode("utf-8"))),
+            )
+            self._evict()
+            self._db.commit()
+
+    # Server answered 304, keep the stored text and restart its TTL
+    def refresh(self, url: str):
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE scrape_cache SET fetched_at = ?, last_access = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self._db.commit()
+
+    # Drop least recently used entries until the cache fits in max_bytes
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM scrape_cache").fetchone()[0]
+
+        while total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT url, size FROM scrape_cache ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+
+            self._db.execute("DELETE FROM scrape_cache WHERE url = ?", (row[0],))
+            total -= row[1]
+            self.evictions += 1
+
+    def is_fresh(self, entry) -> bool:
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM scrape_cache"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+scrape_cache = ScrapeCache()
+
+
+# Scrape a url through the cache. Fresh entries skip the network, stale
+# entries are revalidated with a conditional request
+async def cached_fetch_paragraphs(url: str) -> ExtractResult:
+    key = normalize_url(url)
+    entry = await asyncio.to_thread(scrape_cache.get, key)
+
+    if entry and scrape_cache.is_fresh(entry):
+        scrape_cache.hits += 1
+        return _cached_result(entry)
+
+    headers = {}
+    if entry:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    result = await fetch_paragraphs(url, headers=headers or None)
+
+    if result is None:
+        scrape_cache.hits += 1
+        scrape_cache.revalidated += 1
+        await asyncio.to_thread(scrape_cache.refresh, key)
+        return _cached_result(entry)
+
+    scrape_cache.misses += 1
+    await asyncio.to_thread(scrape_cache.put, key, result.text, result.etag, result.last_modified)
+
+    return result
+
+
+def _cached_result(entry) -> ExtractResult:
+    return ExtractResult(
+        text=entry['text'],
+        paragraphs=entry['text'].count("\n") + 1 if entry['text'] else 0,
+        bytes_read=0,
+        parse_time=0.0,
+        truncated=False,
+        etag=entry['etag'],
+        last_modified=entry['last_modified'],
+        cached=True,
+    )
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Session store settings
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 1000))
+FINISHED_SESSION_TTL = float(os.getenv("FINISHED_SESSION_TTL", 10 * 60))
+
+
+class SessionStoreFullError(Exception):
+    pass
+
+
+# In-memory task sessions with a size limit. Finished tasks are dropped after
+# FINISHED_SESSION_TTL seconds (their results are already stored in Mongo)
+class SessionStore:
+
+    def __init__(self, max_size: int = MAX_SESSIONS, finished_ttl: float = FINISHED_SESSION_TTL):
+        self.max_size = max_size
+        self.finished_ttl = finished_ttl
+        self.evictions = 0
+        self._sessions = {}
+        self._finished = OrderedDict()
+
+    def __getitem__(self, task_id):
+        return self._sessions[task_id]
+
+    def __contains__(self, task_id):
+        return task_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, task_id, default=None):
+        return self._sessions.get(task_id, default)
+
+    def create(self, task_id: str, session: dict):
+        self.evict_expired()
+
+        # Resumed task that is still in memory, it is running again
+        if task_id in self._sessions:
+            self._finished.pop(task_id, None)
+            self._sessions[task_id] = session
+            return
+
+        # Make room by dropping the oldest finished tasks first
+        while len(self._sessions) >= self.max_size and self._finished:
+            self._evict(next(iter(self._finished)))
+
+        if len(self._sessions) >= self.max_size:
+            raise SessionStoreFullError(f"Too many running tasks ({self.max_size}).")
+
+        self._sessions[task_id] = session
+
+    # Mark a task as finished so it can be evicted after the TTL
+    def finish(self, task_id: str):
+        if task_id in self._sessions:
+            self._sessions[task_id]['finished_at'] = time.time()
+            self._finished[task_id] = time.monotonic()
+            self._finished.move_to_end(task_id)
+
+    def evict_expired(self):
+        now = time.monotonic()
+
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if now - finished_at < self.finished_ttl:
+                break
+            self._evict(task_id)
+
+    def _evict(self, task_id: str):
+        self._finished.pop(task_id, None)
+        self._sessions.pop(task_id, None)
+        self.evictions += 1
+
+    # Rough memory used by the stored sessions
+    def memory_usage(self) -> int:
+        total = sys.getsizeof(self._sessions)
+
+        for session in self._sessions.values():
+            total += sys.getsizeof(session)
+            for key, value in session.items():
+                total += sys.getsizeof(key) + sys.getsizeof(value)
+
+        return total
+
+    def stats(self):
+        self.evict_expired()
+
+        return {
+            'sessions': len(self._sessions),
+            'running': len(self._sessions) - len(self._finished),
+            'finished': len(self._finished),
+            'max_size': self.max_size,
+            'finished_ttl_seconds': self.finished_ttl,
+            'evictions': self.evictions,
+            'memory_bytes': self.memory_usage(),
+        }
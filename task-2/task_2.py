@@ -1,21 +1,45 @@
-from agents import Agent, Runner , WebSearchTool, function_tool
-import uuid, httpx , os
-from bs4 import BeautifulSoup
+from agents import Agent, WebSearchTool, function_tool, RunContextWrapper
+from dataclasses import dataclass
+import uuid, os
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from scheduler import stage_limit
+from scrape_cache import cached_fetch_paragraphs
+from session_store import SessionStore, SessionStoreFullError
+from progress import progress
+from persistence import ResultStore
+from checkpoints import CheckpointStore, RESTORED_FIELDS, stage_completed
+from agent_common.memory_collection import InMemoryCollection
+from agent_common.agent_metrics import instrumented_run, instrumented_tool
 
 # Connect Mongodb atlas 
-def initialize_db():
+def initialize_db(collection_name='queryResult'):
     load_dotenv()
     database_url = os.getenv("DATABASE_URL")
+
+    # In-memory stand-in for local runs and tests
+    if database_url and database_url.startswith("memory://"):
+        return InMemoryCollection()
+
     mongo_client = MongoClient(database_url)
     db = mongo_client.get_database('Query_Results')
-    return db['queryResult']
+    return db[collection_name]
 
 collection = initialize_db()
+result_store = ResultStore(collection)
+
+# Stage outputs of every task, so a task can continue after a restart or failure
+checkpoint_collection = initialize_db(os.getenv("CHECKPOINT_COLLECTION", "taskCheckpoints"))
+checkpoints = CheckpointStore(checkpoint_collection)
+
 
+sessions = SessionStore()
 
-sessions = {}
+
+# Run context passed to the agents so tools know which task they work for
+@dataclass
+class TaskContext:
+    task_id: str
 
 async def browse_web(task_id):
 
@@ -28,30 +52,29 @@ async def browse_web(task_id):
 
     input_text = sessions[task_id]["query"]
 
-    result = await Runner.run(web_serach_agent,input_text)
+    result = await instrumented_run(web_serach_agent,input_text, stage="browse_web")
 
     sessions[task_id]['agent1_result'] = result.final_output
 
 
 # Web Scraper Tool
 @function_tool
-async def web_scraping_tool(url: str)-> str:
+@instrumented_tool
+async def web_scraping_tool(wrapper: RunContextWrapper[TaskContext], url: str)-> str:
 
-    task_id = list(sessions.keys())[-1]  
+    task_id = wrapper.context.task_id
     sessions[task_id]['scraped_url'] = url
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    # Repeated urls are served from the on-disk scrape cache
+    result = await cached_fetch_paragraphs(url)
 
-    # Extracting all paragraph text
-    paragraphs = soup.find_all('p')
-    texts = [p.get_text() for p in paragraphs]
-    text = "\n".join(texts)
+    if result.cached:
+        print(f"Scraped {url}: served from cache", flush=True)
+    else:
+        print(f"Scraped {url}: {result.bytes_read} bytes read, {result.paragraphs} paragraphs, "
+              f"parsed in {result.parse_time * 1000:.1f} ms", flush=True)
 
-    return text
+    return result.text
 
 
 async def find_and_scrape_web(task_id):
@@ -64,38 +87,63 @@ async def find_and_scrape_web(task_id):
         tools=[web_scraping_tool],
     )
 
-    result = await Runner.run(find_urls_and_scrape_agent, sessions[task_id]['agent1_result'])
+    result = await instrumented_run(
+        find_urls_and_scrape_agent,
+        sessions[task_id]['agent1_result'],
+        stage="find_and_scrape_web",
+        context=TaskContext(task_id),
+    )
     sessions[task_id]['agent2_result'] = result.final_output
 
 
 async def create_and_store(task_id):
 
-    tutorial_agent = Agent(
-        name="Tutorial Generation Agent",
-        instructions="Generate a tutorial from the given scraped content.",
-        tools=[],
-    )
+    # A tutorial restored from the checkpoint only has to be stored again
+    if 'agent3_result' not in sessions[task_id]:
+        tutorial_agent = Agent(
+            name="Tutorial Generation Agent",
+            instructions="Generate a tutorial from the given scraped content.",
+            tools=[],
+        )
 
-    scraped_content = sessions[task_id]['agent2_result']
-    tutorial_result = await Runner.run(tutorial_agent, scraped_content)
+        scraped_content = sessions[task_id]['agent2_result']
+        tutorial_result = await instrumented_run(tutorial_agent, scraped_content, stage="create_and_store")
 
-    tutorial_content = tutorial_result.final_output
-    sessions[task_id]['agent3_result'] = tutorial_content
+        sessions[task_id]['agent3_result'] = tutorial_result.final_output
 
-    try:
-        scraped_url = sessions[task_id].get('scraped_url', 'N/A')
+        # Checkpointed before the write, a failed write never costs another model call
+        await checkpoints.save_outputs(task_id, agent3_result=sessions[task_id]['agent3_result'])
 
-        collection.insert_one({
-            'task_id': str(task_id),
-            'query': sessions[task_id]['query'],
-            'scraped_url': scraped_url,
-            'tutorial': tutorial_content
-        })
+    scraped_url = sessions[task_id].get('scraped_url', 'N/A')
 
-        print("Data successfully stored in database.")
+    # Batched write, resolves once the batch is stored. A failed write fails
+    # the task, resuming it only retries the write
+    await result_store.save({
+        'task_id': str(task_id),
+        'query': sessions[task_id]['query'],
+        'scraped_url': scraped_url,
+        'tutorial': sessions[task_id]['agent3_result']
+    })
+
+    print("Data successfully stored in database.")
+
+
+# Update the task status and push the change to progress stream clients
+def set_status(task_id, status, final=False, **data):
+    sessions[task_id]["status"] = status
+
+    event = {'task_id': task_id, 'status': status, 'final': final, **data}
+    sessions[task_id]['events'].append(event)
+    progress.publish(task_id, event)
 
-    except Exception as e:
-        print(f"Error occur while inserting db {e}")
+
+# Stages finished before a restart or failure are skipped when the task is resumed
+def stage_done(task_id, stage):
+    return stage_completed(sessions[task_id].get('completed_stage'), stage)
+
+async def complete_stage(task_id, stage, **outputs):
+    sessions[task_id]['completed_stage'] = stage
+    await checkpoints.save_stage(task_id, stage, **outputs)
 
 
 #To run all the 3 task above
@@ -103,44 +151,129 @@ async def run_task(task_id: str):
   
     try:
 
+        await checkpoints.mark(task_id, "running")
+
         #Calling web browsing agent
-        sessions[task_id]["status"] = "web_searching"
-        await browse_web(task_id)
+        if not stage_done(task_id, "browse_web"):
+            set_status(task_id, "web_searching")
+            async with stage_limit("browse_web"):
+                await browse_web(task_id)
+            await complete_stage(task_id, "browse_web", agent1_result=sessions[task_id]['agent1_result'])
 
-        sessions[task_id]["status"] = "web_search_complete"
+        set_status(task_id, "web_search_complete", agent1_result=sessions[task_id]['agent1_result'])
 
         print("Agent 1: \n",sessions[task_id]['agent1_result'], '\n',flush=True)
 
         #Calling web scraping agent
-        sessions[task_id]["status"] = "web_scraping"
-        await find_and_scrape_web(task_id)
-        sessions[task_id]["status"] = "web_scraping_complete"
+        if not stage_done(task_id, "find_and_scrape_web"):
+            set_status(task_id, "web_scraping")
+            async with stage_limit("find_and_scrape_web"):
+                await find_and_scrape_web(task_id)
+            await complete_stage(
+                task_id,
+                "find_and_scrape_web",
+                scraped_url=sessions[task_id].get('scraped_url', 'N/A'),
+                agent2_result=sessions[task_id]['agent2_result'],
+            )
+
+        set_status(
+            task_id,
+            "web_scraping_complete",
+            scraped_url=sessions[task_id].get('scraped_url', 'N/A'),
+            agent2_result=sessions[task_id]['agent2_result'],
+        )
 
         print("Agent 2: \n", sessions[task_id]['agent2_result'],'\n',flush=True)
 
         #Calling tutorial generator agent
-        sessions[task_id]["status"] = "tutorial_generating"
-        await create_and_store(task_id)
-        sessions[task_id]["status"] = "tutorial_generated_and_saved_in_db"
+        if not stage_done(task_id, "create_and_store"):
+            set_status(task_id, "tutorial_generating")
+            async with stage_limit("create_and_store"):
+                await create_and_store(task_id)
+            await complete_stage(task_id, "create_and_store", agent3_result=sessions[task_id]['agent3_result'])
+
+        set_status(task_id, "tutorial_generated_and_saved_in_db")
 
         print("Agent 3: \n", sessions[task_id]['agent3_result'],'\n',flush=True)
 
-        sessions[task_id]["status"] = "Done"
+        set_status(
+            task_id,
+            "Done",
+            final=True,
+            query=sessions[task_id]['query'],
+            scraped_url=sessions[task_id].get('scraped_url', 'N/A'),
+            tutorial=sessions[task_id]['agent3_result'],
+        )
+        await checkpoints.finish(task_id)
 
     except Exception as e:
-        sessions[task_id]["staus"] = f"Error occurs: {str(e)}"
+        set_status(task_id, f"Error occurs: {str(e)}", final=True)
+        await checkpoints.mark(task_id, "failed", error=str(e))
+
+    finally:
+        sessions.finish(task_id)
 
 def create_new_task(request):
 
     task_id = str(uuid.uuid4())
     
-    sessions[task_id] = {
+    sessions.create(task_id, {
         'query': request,
-        'status': 'created'
-    }
+        'status': 'created',
+        'events': [{'task_id': task_id, 'status': 'created', 'final': False}],
+    })
+    checkpoints.created(task_id, request)
+
+    return task_id
+
+
+class TaskNotResumableError(Exception):
+    pass
+
+# Rebuild the session of a stored task from its checkpoint, so run_task
+# continues after the last completed stage. None when the task is unknown
+async def resume_task(task_id):
+    session = sessions.get(task_id)
+    if session and 'finished_at' not in session:
+        raise TaskNotResumableError("Task is still queued or running.")
+
+    checkpoint = await checkpoints.load(task_id)
+    if checkpoint is None:
+        return None
+
+    if checkpoint.get('state') == 'done':
+        raise TaskNotResumableError("Task is already done.")
+
+    completed_stage = checkpoint.get('completed_stage')
+    sessions.create(task_id, {
+        'query': checkpoint['query'],
+        'status': 'resuming',
+        'completed_stage': completed_stage,
+        'events': [{'task_id': task_id, 'status': 'resuming', 'final': False, 'completed_stage': completed_stage}],
+        **{field: checkpoint[field] for field in RESTORED_FIELDS if field in checkpoint},
+    })
+    checkpoints.resumed += 1
 
     return task_id
 
+# Tasks that were queued or running when the process stopped, restored one
+# at a time so the caller can schedule each before the next is rebuilt
+async def recover_tasks():
+    for checkpoint in await checkpoints.unfinished():
+        task_id = checkpoint['task_id']
+        try:
+            if await resume_task(task_id):
+                yield task_id
+        except (TaskNotResumableError, SessionStoreFullError) as e:
+            print(f"Could not recover task {task_id}: {e}", flush=True)
+
+# A rebuilt session that could not be queued is finished again, so it does
+# not count as running and the task can be resumed later
+def unschedule(task_id, reason):
+    set_status(task_id, f"Not scheduled: {reason}", final=True)
+    sessions.finish(task_id)
+
 def get_status(task_id):
-    return sessions[task_id]["status"]
+    session = sessions.get(task_id)
+    return session["status"] if session else None
 
@@ -1,6 +1,7 @@
-import os , requests, json
+import os , json
 from datetime import date, timedelta
-from agents import Agent, Runner
+from agents import Agent, Runner, function_tool
+from flight_prices import FlightPriceClient
 from pydantic import BaseModel
 
 flight_api_key = os.getenv("FLIGHT_API_KEY")
@@ -21,27 +22,21 @@ def date_current_plus_5():
     return new_date_str
 
 
-async def search_flight_tool(origin: str , destination: str, depart_date: str, direct: bool):
-    base_url = "https://api.travelpayouts.com/aviasales/v3/prices_for_dates"
+flight_price_client = FlightPriceClient(flight_api_key)
 
-    params = {
-        "origin": origin,
-        "destination": destination,
-        "departure_at": depart_date,
-        "currency": "usd",
-        "sorting": "price",
-        "direct": direct,
-        "token": flight_api_key 
-    }
+@function_tool
+async def search_flight_tool(origin: str , destination: str, depart_from: str, depart_to: str, direct: bool):
+    """Find the cheapest flights per day between two airport codes for departures
+    from depart_from to depart_to (YYYY-MM or YYYY-MM-DD)."""
     try:
-        response = await requests.get(base_url, params=params)
-
-        if response.status_code == 200:
-            return json.dumps(response['data'])
-        else: 
-            return {"Error": "Error in fetching flights"}
-    except:
-        return {"Error": "Error in fetching flights"}
+        # Whole months are one request each, shorter ranges are searched per day
+        granularity = "month" if len(depart_from.split("-")) == 2 else "day"
+        calendar = await flight_price_client.price_calendar(
+            origin, destination, depart_from, depart_to, direct=direct, granularity=granularity
+        )
+        return json.dumps(calendar)
+    except Exception as e:
+        return json.dumps({"Error": f"Error in fetching flights: {e}"})
     
 
 flight_search_agent = Agent(
@@ -49,7 +44,7 @@ flight_search_agent = Agent(
     handoff_description="Speacialist agent for finding and recommending best fligts.",
     instructions="""
     You are a flight specialist that helps user to recommend best flights option,
-    You use get_flights_tool to find flight options and the provide personalize recommendations,
+    You use search_flight_tool to find the cheapest flights over the requested dates and the provide personalize recommendations,
     Always explain reasoning behind your recommendations. 
     Format your response in a clear organized way, with flight details, and price.. 
     """,
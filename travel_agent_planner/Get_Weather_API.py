@@ -1,28 +1,144 @@
-import os, requests
+import os, asyncio, time
+import httpx
+from agents import function_tool
 
 weather_api_key = os.getenv("GET_WEATHER_API_KEY")
 
-async def get_weather_tool(city: str):
-    base_url = "http://api.weatherapi.com/v1/current.json"
-    params = {
-        "key": weather_api_key,
-        "q": city
-    }
+# Weather client settings
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "http://api.weatherapi.com/v1/current.json")
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", 10 * 60))
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", 10))
+WEATHER_MAX_CONNECTIONS = int(os.getenv("WEATHER_MAX_CONNECTIONS", 20))
+WEATHER_RETRIES = int(os.getenv("WEATHER_RETRIES", 2))
+WEATHER_HOT_DESTINATIONS = [city.strip() for city in os.getenv("WEATHER_HOT_DESTINATIONS", "").split(",") if city.strip()]
+
+
+def _unknown(city: str):
+    return {"location": city, "temperature": "N/A", "condition": "Unknown"}
+
+
+# Async weather client with one pooled connection, a per-city TTL cache and
+# coalescing of concurrent requests for the same city into one upstream call
+class WeatherClient:
+
+    def __init__(self, api_key: str = None, base_url: str = WEATHER_API_URL, ttl: float = WEATHER_CACHE_TTL,
+                 retries: int = WEATHER_RETRIES, client: httpx.AsyncClient = None):
+        self.api_key = api_key if api_key is not None else weather_api_key
+        self.base_url = base_url
+        self.ttl = ttl
+        self.retries = retries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self._client = client
+        self._cache = {}
+        self._inflight = {}
+        self._blocked_until = 0.0
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=WEATHER_TIMEOUT,
+                limits=httpx.Limits(max_connections=WEATHER_MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_weather(self, city: str):
+        key = " ".join(city.lower().split())
+
+        cached = self._cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            self.hits += 1
+            return cached[0]
+
+        # Someone is already fetching this city, wait for the same result
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.misses += 1
+        future = asyncio.ensure_future(self._fetch(city))
+        self._inflight[key] = future
+
+        try:
+            weather = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+
+        # Failed lookups are not cached
+        if weather["condition"] != "Unknown":
+            self._cache[key] = (weather, time.monotonic() + self.ttl)
+
+        return weather
+
+    async def _fetch(self, city: str):
+        params = {
+            "key": self.api_key,
+            "q": city
+        }
+
+        for attempt in range(self.retries + 1):
+            # Wait out a rate limit reported by the API
+            delay = self._blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                response = await self._get_client().get(self.base_url, params=params)
+            except httpx.TransportError:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+
+            if response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = response.headers.get("retry-after", "")
+                self._blocked_until = time.monotonic() + (float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                continue
+
+            if response.status_code != 200:
+                return _unknown(city)
 
-    try:
-        response = await requests.get(base_url, params=params)
-        if response.status_code == 200:
             data = response.json()
-            location = data['location']['name']
-            temp_c = data['current']['temp_c']
-            condition = data['current']['condition']['text']
-         
             return {
-                "location": location,
-                "temperature": f"{temp_c}°C",
-                "condition": condition
+                "location": data['location']['name'],
+                "temperature": f"{data['current']['temp_c']}°C",
+                "condition": data['current']['condition']['text']
             }
-        else:
-            return {"location": city, "temperature": "N/A", "condition": "Unknown"}
-    except Exception as e:
-        return {"location": city, "temperature": "N/A", "condition": "Unknown"}
\ No newline at end of file
+
+        return _unknown(city)
+
+    # Warm the cache for popular destinations, failed lookups are simply not cached
+    async def prefetch(self, cities=None):
+        cities = WEATHER_HOT_DESTINATIONS if cities is None else cities
+        await asyncio.gather(*(self.get_weather(city) for city in cities), return_exceptions=True)
+
+    def stats(self):
+        return {
+            'cached_cities': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'rate_limited': self.rate_limited,
+        }
+
+
+weather_client = WeatherClient()
+
+
+async def get_weather(city: str):
+    try:
+        return await weather_client.get_weather(city)
+    except Exception:
+        return _unknown(city)
+
+
+@function_tool
+async def get_weather_tool(city: str) -> dict:
+    """Get the current weather for a city."""
+    return await get_weather(city)
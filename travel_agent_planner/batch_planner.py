@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from agents import InputGuardrailTripwireTriggered
+from travel_planner import (
+    GUARDRAIL_MODE, GUARDRAIL_MODES, FlightRecommendation, HotelRecommendation, TravelPlan, UserContext, run_travel_agent,
+    start_weather_client, stop_weather_client,
+)
+
+# python batch_planner.py -i queries.jsonl -o results.jsonl -c 8
+#
+# Each input line is {"query": "...", "id": "...", "user_id": "...",
+# "preferred_airlines": [...], "hotel_amenities": [...], "budget_level": "..."}
+# (only "query" is required) or a plain JSON string. Results are written as
+# JSONL lines in the order they finish.
+
+RESULT_TYPES = [
+    (FlightRecommendation, "flight_recommendation"),
+    (HotelRecommendation, "hotel_recommendation"),
+    (TravelPlan, "travel_plan"),
+]
+
+
+def read_requests(stream):
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        request = json.loads(line)
+        if isinstance(request, str):
+            request = {"query": request}
+
+        request.setdefault("id", str(line_number))
+        yield request
+
+
+def build_context(request):
+    if "user_id" not in request:
+        return None
+
+    return UserContext(
+        user_id=request["user_id"],
+        preferred_airlines=request.get("preferred_airlines"),
+        hotel_amenities=request.get("hotel_amenities"),
+        budget_level=request.get("budget_level"),
+    )
+
+
+# Typed JSON record for one finished query
+def to_record(request, output, latency):
+    record = {"id": request["id"], "query": request["query"], "latency": round(latency, 3)}
+
+    if isinstance(output, InputGuardrailTripwireTriggered):
+        analysis = output.guardrail_result.output.output_info
+        record["type"] = "guardrail_tripwire"
+        record["output"] = analysis.model_dump() if hasattr(analysis, "model_dump") else str(analysis)
+        return record
+
+    if isinstance(output, Exception):
+        record["type"] = "error"
+        record["output"] = f"{type(output).__name__}: {output}"
+        return record
+
+    for model_class, result_type in RESULT_TYPES:
+        if isinstance(output, model_class):
+            record["type"] = result_type
+            record["output"] = output.model_dump()
+            return record
+
+    record["type"] = "text"
+    record["output"] = str(output)
+    return record
+
+
+async def run_one(request, mode):
+    start = time.perf_counter()
+    try:
+        result = await run_travel_agent(request["query"], context=build_context(request), mode=mode)
+        output = result.final_output
+    except Exception as e:
+        output = e
+
+    return to_record(request, output, time.perf_counter() - start)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+# Up to `concurrency` queries run at once. Requests are read lazily, so large
+# inputs are never held in memory as pending tasks
+async def run_batch(requests, output, concurrency: int = 8, mode: str = GUARDRAIL_MODE):
+    requests = iter(requests)
+    latencies = []
+    counts = {}
+
+    async def worker():
+        for request in requests:
+            record = await run_one(request, mode)
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+            latencies.append(record["latency"])
+            counts[record["type"]] = counts.get(record["type"], 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "queries": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "types": counts,
+    }
+
+
+def print_summary(summary):
+    print(
+        f"\n{summary['queries']} queries in {summary['elapsed']:.2f}s "
+        f"({summary['throughput']:.2f} queries/s), "
+        f"p50 {summary['p50']:.2f}s, p95 {summary['p95']:.2f}s",
+        file=sys.stderr,
+    )
+    for result_type, count in sorted(summary["types"].items()):
+        print(f"  {result_type}: {count}", file=sys.stderr)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run travel planner queries in bulk.")
+    parser.add_argument("-i", "--input", help="JSONL file with queries (default: stdin)")
+    parser.add_argument("-o", "--output", help="JSONL file for results (default: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Queries running at the same time")
+    parser.add_argument("--guardrail-mode", default=GUARDRAIL_MODE, choices=GUARDRAIL_MODES)
+    args = parser.parse_args()
+
+    source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    await start_weather_client()
+    try:
+        summary = await run_batch(read_requests(source), output, args.concurrency, args.guardrail_mode)
+    finally:
+        await stop_weather_client()
+        if args.input:
+            source.close()
+        if args.output:
+            output.close()
+
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Lookup and ranking latency of the flight schedule index behind get_flights_tool.
+
+Usage: python bench_flight_schedule.py [rows] [airports] [days] [queries]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+import numpy as np
+from flight_schedule import FlightSchedule
+
+AIRLINES = ["SkyWays", "OceanAir", "MountainJet", "SunFly", "NorthStar", "BlueLine", "RedTail", "Aurora"]
+
+
+def synthetic_columns(rows: int, airports: int, days: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"A{i:03d}" for i in range(airports)])
+    dates = np.array([(date(2025, 1, 1) + timedelta(days=i)).isoformat() for i in range(days)])
+
+    origin = rng.integers(0, airports, rows)
+    destination = (origin + rng.integers(1, airports, rows)) % airports
+    departure = rng.integers(0, 24 * 60, rows)
+    duration = rng.integers(45, 900, rows)
+
+    return {
+        "origin": codes[origin],
+        "destination": codes[destination],
+        "date": dates[rng.integers(0, days, rows)],
+        "airline": np.array(AIRLINES)[rng.integers(0, len(AIRLINES), rows)],
+        "departure_time": np.char.add(np.char.zfill((departure // 60).astype(str), 2), ":00"),
+        "arrival_time": np.char.add(np.char.zfill(((departure + duration) // 60 % 24).astype(str), 2), ":00"),
+        "price": rng.uniform(40, 1500, rows).round(2),
+        "direct": rng.random(rows) < 0.4,
+        "duration_minutes": duration,
+    }, codes, dates
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    airports = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 90
+    queries = int(sys.argv[4]) if len(sys.argv) > 4 else 5000
+
+    columns, codes, dates = synthetic_columns(rows, airports, days)
+
+    start = time.perf_counter()
+    schedule = FlightSchedule(columns)
+    print(f"Indexed {len(schedule)} flights on {len(schedule.routes)} route-days in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(5)
+    latencies = []
+    for _ in range(queries):
+        origin, destination = rng.sample(list(codes), 2)
+        query_start = time.perf_counter()
+        schedule.search(origin, destination, rng.choice(dates), preferred_airlines=rng.sample(AIRLINES, 2))
+        latencies.append(time.perf_counter() - query_start)
+
+    print(f"{queries} searches: p50 {percentile(latencies, 0.5) * 1e6:.0f} us, "
+          f"p95 {percentile(latencies, 0.95) * 1e6:.0f} us, "
+          f"max {max(latencies) * 1e6:.0f} us")
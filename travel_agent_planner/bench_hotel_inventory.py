@@ -0,0 +1,70 @@
+"""Microbenchmark for the indexed hotel inventory behind get_hotels_tool.
+
+Usage: python bench_hotel_inventory.py [hotels] [cities] [queries]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+from hotel_inventory import HotelInventory
+
+AMENITIES = [
+    "WiFi", "Pool", "Gym", "Restaurant", "Spa", "Parking", "Free Breakfast", "Bar",
+    "Concierge", "Fine Dining", "Airport Shuttle", "Pet Friendly", "Beach Access",
+    "Kitchen", "Laundry", "Room Service",
+]
+
+
+def synthetic_hotels(count: int, cities: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    hotels = []
+
+    for i in range(count):
+        booked = [(start + timedelta(days=rng.randrange(365))).isoformat() for _ in range(rng.randrange(0, 20))]
+        hotels.append({
+            "name": f"Hotel {i}",
+            "city": f"City {i % cities}",
+            "location": f"District {rng.randrange(10)}",
+            "price_per_night": round(rng.uniform(40, 900), 2),
+            "amenities": rng.sample(AMENITIES, rng.randrange(1, 8)),
+            "booked": booked,
+        })
+
+    return hotels
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    cities = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    records = synthetic_hotels(count, cities)
+
+    start = time.perf_counter()
+    inventory = HotelInventory(records)
+    print(f"Indexed {count} hotels in {cities} cities in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(11)
+    latencies = []
+    for _ in range(queries):
+        check_in = date(2025, 1, 1) + timedelta(days=rng.randrange(360))
+        query_start = time.perf_counter()
+        inventory.search(
+            f"City {rng.randrange(cities)}",
+            check_in.isoformat(),
+            (check_in + timedelta(days=rng.randrange(1, 8))).isoformat(),
+            max_price=rng.choice([None, 150, 300, 600]),
+            amenities=rng.sample(AMENITIES, 3),
+            budget_level=rng.choice([None, "budget", "mid", "luxury"]),
+        )
+        latencies.append(time.perf_counter() - query_start)
+
+    print(f"{queries} searches: p50 {percentile(latencies, 0.5) * 1e6:.0f} us, "
+          f"p95 {percentile(latencies, 0.95) * 1e6:.0f} us, "
+          f"max {max(latencies) * 1e6:.0f} us")
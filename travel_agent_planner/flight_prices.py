@@ -0,0 +1,143 @@
+import asyncio
+import calendar
+import os
+from datetime import date, timedelta
+import httpx
+
+# Travelpayouts client settings
+FLIGHT_API_URL = os.getenv("FLIGHT_API_URL", "https://api.travelpayouts.com/aviasales/v3/prices_for_dates")
+FLIGHT_API_CONCURRENCY = int(os.getenv("FLIGHT_API_CONCURRENCY", 6))
+FLIGHT_API_RETRIES = int(os.getenv("FLIGHT_API_RETRIES", 3))
+FLIGHT_API_BACKOFF = float(os.getenv("FLIGHT_API_BACKOFF", 0.5))
+FLIGHT_API_TIMEOUT = float(os.getenv("FLIGHT_API_TIMEOUT", 10))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FlightSearchError(Exception):
+    pass
+
+
+def _parse(value: str, end: bool = False) -> date:
+    value = value.strip()
+    parts = [int(part) for part in value.split("-")]
+
+    # "2025-4" means the whole month
+    if len(parts) == 2:
+        year, month = parts
+        day = calendar.monthrange(year, month)[1] if end else 1
+        return date(year, month, day)
+
+    return date(*parts)
+
+
+# Split a date range into departure_at values: "YYYY-MM" per month or
+# "YYYY-MM-DD" per day
+def split_date_range(start: str, end: str, granularity: str = "month"):
+    first, last = _parse(start), _parse(end, end=True)
+
+    if last < first:
+        raise ValueError(f"Date range ends before it starts: {start} - {end}")
+
+    if granularity == "day":
+        return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+    months = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return months
+
+
+# Async travelpayouts client. A date range is fanned out into concurrent
+# requests (capped by a semaphore, retried with backoff) and merged into a
+# cheapest-per-day price calendar
+class FlightPriceClient:
+
+    def __init__(self, token: str = None, base_url: str = FLIGHT_API_URL, concurrency: int = FLIGHT_API_CONCURRENCY,
+                 retries: int = FLIGHT_API_RETRIES, backoff: float = FLIGHT_API_BACKOFF, client: httpx.AsyncClient = None):
+        self.token = token if token is not None else os.getenv("FLIGHT_API_KEY")
+        self.base_url = base_url
+        self.retries = retries
+        self.backoff = backoff
+        self.requests_made = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = client
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=FLIGHT_API_TIMEOUT)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def prices_for_date(self, origin: str, destination: str, departure_at: str, direct: bool = False):
+        params = {
+            "origin": origin,
+            "destination": destination,
+            "departure_at": departure_at,
+            "currency": "usd",
+            "sorting": "price",
+            "direct": str(direct).lower(),
+            "limit": 1000,
+            "token": self.token,
+        }
+
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                self.requests_made += 1
+                try:
+                    response = await self._get_client().get(self.base_url, params=params)
+                except httpx.TransportError as e:
+                    error = f"{departure_at}: {e}"
+                else:
+                    if response.status_code == 200:
+                        return response.json().get("data", [])
+                    if response.status_code not in RETRY_STATUS:
+                        raise FlightSearchError(f"{departure_at}: HTTP {response.status_code}")
+                    error = f"{departure_at}: HTTP {response.status_code}"
+
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+
+        raise FlightSearchError(error)
+
+    async def price_calendar(self, origin: str, destination: str, depart_from: str, depart_to: str,
+                             direct: bool = False, granularity: str = "month", top_k: int = 5):
+        periods = split_date_range(depart_from, depart_to, granularity)
+        first, last = _parse(depart_from).isoformat(), _parse(depart_to, end=True).isoformat()
+
+        results = await asyncio.gather(
+            *(self.prices_for_date(origin, destination, period, direct) for period in periods),
+            return_exceptions=True,
+        )
+
+        cheapest_per_day = {}
+        errors = []
+        for period, result in zip(periods, results):
+            if isinstance(result, Exception):
+                errors.append(str(result))
+                continue
+
+            for flight in result:
+                day = str(flight.get("departure_at", ""))[:10]
+                if not (first <= day <= last) or flight.get("price") is None:
+                    continue
+
+                if day not in cheapest_per_day or flight["price"] < cheapest_per_day[day]["price"]:
+                    cheapest_per_day[day] = flight
+
+        best_options = sorted(cheapest_per_day.values(), key=lambda flight: flight["price"])[:top_k]
+
+        return {
+            "origin": origin,
+            "destination": destination,
+            "cheapest_per_day": {day: cheapest_per_day[day] for day in sorted(cheapest_per_day)},
+            "best_options": best_options,
+            "errors": errors,
+        }
@@ -0,0 +1,159 @@
+import csv
+import os
+from typing import List
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Schedule settings
+FLIGHT_SCHEDULE_PATH = os.getenv("FLIGHT_SCHEDULE_PATH")
+FLIGHT_TOP_K = int(os.getenv("FLIGHT_TOP_K", 5))
+
+# Ranking weights, lower score is better
+PRICE_WEIGHT = float(os.getenv("FLIGHT_PRICE_WEIGHT", 1.0))
+STOPS_WEIGHT = float(os.getenv("FLIGHT_STOPS_WEIGHT", 0.5))
+DURATION_WEIGHT = float(os.getenv("FLIGHT_DURATION_WEIGHT", 0.3))
+PREFERRED_AIRLINE_WEIGHT = float(os.getenv("FLIGHT_PREFERRED_AIRLINE_WEIGHT", 0.75))
+
+# Any route and date matches these flights, used when no schedule file is configured
+ANY = "*"
+
+SAMPLE_FLIGHTS = {
+    "origin": [ANY, ANY, ANY],
+    "destination": [ANY, ANY, ANY],
+    "date": [ANY, ANY, ANY],
+    "airline": ["SkyWays", "OceanAir", "MountainJet"],
+    "departure_time": ["08:00", "12:45", "16:30"],
+    "arrival_time": ["10:30", "15:15", "21:45"],
+    "price": [350.00, 275.50, 225.75],
+    "direct": [True, True, False],
+    "duration_minutes": [150, 150, 315],
+}
+
+COLUMNS = ("origin", "destination", "date", "airline", "departure_time", "arrival_time", "price", "direct", "duration_minutes")
+
+
+def _key(origin: str, destination: str, date: str) -> str:
+    return f"{origin.strip().lower()}|{destination.strip().lower()}|{str(date).strip()[:10]}"
+
+
+def _as_bool(values):
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return np.isin(np.char.lower(values.astype(str)), ["true", "1", "yes", "y"])
+
+
+# Read the schedule columns from CSV or Parquet (Parquet needs pandas and pyarrow)
+def read_columns(path: str) -> dict:
+    if path.endswith(".parquet"):
+        import pandas as pd
+        frame = pd.read_parquet(path, columns=list(COLUMNS))
+        return {column: frame[column].to_numpy() for column in COLUMNS}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    return {column: [row[column] for row in rows] for column in COLUMNS}
+
+
+# Columnar flight schedule, rows grouped by (origin, destination, date) so a
+# lookup is one dict access plus a contiguous slice of every column
+class FlightSchedule:
+
+    def __init__(self, columns: dict):
+        keys = np.array([
+            _key(origin, destination, date)
+            for origin, destination, date in zip(columns["origin"], columns["destination"], columns["date"])
+        ])
+        route_keys, route_codes = np.unique(keys, return_inverse=True)
+        order = np.argsort(route_codes, kind="stable")
+
+        self.airline_names, airline_codes = np.unique(np.asarray(columns["airline"], dtype=str), return_inverse=True)
+        self.airline_codes = airline_codes[order].astype(np.int32)
+        self.price = np.asarray(columns["price"], dtype=np.float64)[order]
+        self.direct = _as_bool(columns["direct"])[order]
+        self.duration = np.asarray(columns["duration_minutes"], dtype=np.float64)[order]
+        self.departure_time = np.asarray(columns["departure_time"], dtype=str)[order]
+        self.arrival_time = np.asarray(columns["arrival_time"], dtype=str)[order]
+
+        # Slice of each route in the sorted columns
+        starts = np.searchsorted(route_codes[order], np.arange(len(route_keys)), side="left")
+        ends = np.append(starts[1:], len(order))
+        self.routes = {key: (int(start), int(end)) for key, start, end in zip(route_keys, starts, ends)}
+
+    @classmethod
+    def load(cls, path: str):
+        return cls(read_columns(path))
+
+    def __len__(self):
+        return len(self.price)
+
+    def _slice(self, origin: str, destination: str, date: str):
+        return self.routes.get(_key(origin, destination, date)) or self.routes.get(_key(ANY, ANY, ANY))
+
+    def search(self, origin: str, destination: str, date: str, preferred_airlines: List[str] = None,
+               top_k: int = FLIGHT_TOP_K) -> List[dict]:
+        route = self._slice(origin, destination, date)
+        if route is None:
+            return []
+
+        start, end = route
+        price = self.price[start:end]
+        direct = self.direct[start:end]
+        duration = self.duration[start:end]
+        airline_codes = self.airline_codes[start:end]
+
+        # Normalize price and duration within the route so the weights are comparable
+        def scaled(values):
+            spread = values.max() - values.min()
+            return (values - values.min()) / spread if spread else np.zeros_like(values)
+
+        score = PRICE_WEIGHT * scaled(price) + DURATION_WEIGHT * scaled(duration) + STOPS_WEIGHT * ~direct
+
+        preferred = np.zeros(len(price), dtype=bool)
+        if preferred_airlines:
+            preferred_codes = np.flatnonzero(np.isin(self.airline_names, preferred_airlines))
+            preferred = np.isin(airline_codes, preferred_codes)
+            score = score - PREFERRED_AIRLINE_WEIGHT * preferred
+
+        # Only the best top_k rows are sorted
+        if len(score) > top_k:
+            best = np.argpartition(score, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(score))
+        best = best[np.argsort(score[best], kind="stable")]
+
+        flights = []
+        for position in best:
+            row = start + int(position)
+            flight = {
+                "airline": str(self.airline_names[self.airline_codes[row]]),
+                "departure_time": str(self.departure_time[row]),
+                "arrival_time": str(self.arrival_time[row]),
+                "price": float(self.price[row]),
+                "direct": bool(self.direct[row]),
+                "duration_minutes": int(self.duration[row]),
+            }
+            if preferred[position]:
+                flight["preferred"] = True
+            flights.append(flight)
+
+        return flights
+
+
+_schedule = None
+
+
+# Loaded once on first use
+def get_schedule() -> FlightSchedule:
+    global _schedule
+
+    if _schedule is None:
+        if FLIGHT_SCHEDULE_PATH and os.path.exists(FLIGHT_SCHEDULE_PATH):
+            _schedule = FlightSchedule.load(FLIGHT_SCHEDULE_PATH)
+        else:
+            _schedule = FlightSchedule(SAMPLE_FLIGHTS)
+
+    return _schedule
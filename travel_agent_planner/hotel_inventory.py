@@ -0,0 +1,219 @@
+import csv
+import json
+import os
+from datetime import date
+from typing import List, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Inventory settings
+HOTEL_INVENTORY_PATH = os.getenv("HOTEL_INVENTORY_PATH")
+HOTEL_TOP_K = int(os.getenv("HOTEL_TOP_K", 5))
+
+# Larger than any date ordinal, used to key booked days by hotel
+DAY_RANGE = date.max.toordinal() + 1
+
+# Any city matches these hotels, used when no inventory file is configured
+ANY_CITY = "*"
+
+SAMPLE_HOTELS = [
+    {
+        "name": "City Center Hotel",
+        "city": ANY_CITY,
+        "location": "Downtown",
+        "price_per_night": 199.99,
+        "amenities": ["WiFi", "Pool", "Gym", "Restaurant"]
+    },
+    {
+        "name": "Riverside Inn",
+        "city": ANY_CITY,
+        "location": "Riverside District",
+        "price_per_night": 149.50,
+        "amenities": ["WiFi", "Free Breakfast", "Parking"]
+    },
+    {
+        "name": "Luxury Palace",
+        "city": ANY_CITY,
+        "location": "Historic District",
+        "price_per_night": 349.99,
+        "amenities": ["WiFi", "Pool", "Spa", "Fine Dining", "Concierge"]
+    }
+]
+
+
+def _city_key(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+def _parse_date(value) -> Optional[int]:
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+# Hotels of one city sorted by price, with their amenity bitsets
+class CityIndex:
+
+    def __init__(self, hotel_ids, prices, masks):
+        order = np.argsort(prices, kind="stable")
+        self.hotel_ids = hotel_ids[order]
+        self.prices = prices[order]
+        self.masks = masks[order]
+
+
+# In-memory hotel inventory with a city index, price sorted arrays for
+# max_price range queries, amenity bitsets and booked-date lookup
+class HotelInventory:
+
+    def __init__(self, records):
+        self.hotels = []
+        self.amenity_bits = {}
+
+        for record in records:
+            amenities = record.get("amenities") or []
+            for amenity in amenities:
+                self.amenity_bits.setdefault(amenity.lower(), len(self.amenity_bits))
+
+            self.hotels.append({
+                "name": record["name"],
+                "city": record.get("city", ANY_CITY),
+                "location": record.get("location", ""),
+                "price_per_night": float(record["price_per_night"]),
+                "amenities": list(amenities),
+            })
+
+        # One uint64 word per 64 amenities
+        self.words = max(1, (len(self.amenity_bits) + 63) // 64)
+        masks = np.zeros((len(self.hotels), self.words), dtype=np.uint64)
+        prices = np.array([hotel["price_per_night"] for hotel in self.hotels], dtype=np.float64)
+
+        for hotel_id, hotel in enumerate(self.hotels):
+            masks[hotel_id] = self.amenity_mask(hotel["amenities"])
+
+        # Booked days of all hotels as one sorted array of hotel_id * DAY_RANGE + day,
+        # so availability of many hotels is a single vectorized binary search
+        keys = [
+            hotel_id * DAY_RANGE + day
+            for hotel_id, record in enumerate(records)
+            for day in map(_parse_date, record.get("booked") or [])
+            if day is not None
+        ]
+        self.booking_keys = np.unique(np.array(keys, dtype=np.int64))
+
+        cities = {}
+        for hotel_id, hotel in enumerate(self.hotels):
+            cities.setdefault(_city_key(hotel["city"]), []).append(hotel_id)
+
+        self.cities = {}
+        for city, ids in cities.items():
+            ids = np.array(ids, dtype=np.int64)
+            self.cities[city] = CityIndex(ids, prices[ids], masks[ids])
+
+    # JSONL (one hotel per line) or CSV with "|" separated amenities and booked dates
+    @classmethod
+    def load(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                records = []
+                for row in csv.DictReader(f):
+                    row["amenities"] = [a for a in (row.get("amenities") or "").split("|") if a]
+                    row["booked"] = [d for d in (row.get("booked") or "").split("|") if d]
+                    records.append(row)
+            else:
+                records = [json.loads(line) for line in f if line.strip()]
+
+        return cls(records)
+
+    def amenity_mask(self, amenities):
+        mask = np.zeros(self.words, dtype=np.uint64)
+
+        for amenity in amenities:
+            bit = self.amenity_bits.get(amenity.lower())
+            if bit is not None:
+                mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+
+        return mask
+
+    def _candidates(self, city: str, max_price: Optional[float]):
+        indexes = [self.cities.get(_city_key(city)), self.cities.get(ANY_CITY)]
+        parts = []
+
+        for index in indexes:
+            if index is None:
+                continue
+
+            # Prices are sorted, so max_price is a binary search
+            end = len(index.prices) if max_price is None else np.searchsorted(index.prices, max_price, side="right")
+            parts.append((index.hotel_ids[:end], index.prices[:end], index.masks[:end]))
+
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty((0, self.words), dtype=np.uint64)
+
+        if len(parts) == 1:
+            return parts[0]
+
+        return tuple(np.concatenate(columns) for columns in zip(*parts))
+
+    # Any booked day in [check_in, check_out) makes a hotel unavailable
+    def available(self, hotel_ids, check_in: int, check_out: int):
+        first = np.searchsorted(self.booking_keys, hotel_ids * DAY_RANGE + check_in, side="left")
+        last = np.searchsorted(self.booking_keys, hotel_ids * DAY_RANGE + check_out, side="left")
+        return first == last
+
+    def search(self, city: str, check_in: str = None, check_out: str = None, max_price: Optional[float] = None,
+               amenities: List[str] = None, budget_level: Optional[str] = None, top_k: int = HOTEL_TOP_K):
+        hotel_ids, prices, masks = self._candidates(city, max_price)
+
+        # Drop hotels booked during the stay
+        start, end = _parse_date(check_in), _parse_date(check_out)
+        if start is not None and len(hotel_ids):
+            end = end if end is not None and end > start else start + 1
+            keep = self.available(hotel_ids, start, end)
+            hotel_ids, prices, masks = hotel_ids[keep], prices[keep], masks[keep]
+
+        # Amenity overlap for every candidate at once
+        preferred = self.amenity_mask(amenities or [])
+        scores = np.bitwise_count(masks & preferred).sum(axis=1).astype(np.int64)
+
+        if budget_level == "luxury":
+            price_key = -prices
+        elif budget_level in ("mid", "moderate", "standard") and len(prices):
+            price_key = np.abs(prices - np.median(prices))
+        else:
+            price_key = prices
+
+        # Best amenity match first, then by price for the budget level
+        order = np.lexsort((price_key, -scores))[:top_k]
+
+        results = []
+        preferred_names = {amenity.lower() for amenity in amenities or []}
+        for position in order:
+            hotel = dict(self.hotels[int(hotel_ids[position])])
+            hotel.pop("city", None)
+
+            if preferred_names:
+                hotel["matching_amenities"] = [a for a in hotel["amenities"] if a.lower() in preferred_names]
+                hotel["preferred_amenities_score"] = int(scores[position])
+
+            results.append(hotel)
+
+        return results
+
+
+_inventory = None
+
+
+# Loaded once on first use
+def get_inventory() -> HotelInventory:
+    global _inventory
+
+    if _inventory is None:
+        if HOTEL_INVENTORY_PATH and os.path.exists(HOTEL_INVENTORY_PATH):
+            _inventory = HotelInventory.load(HOTEL_INVENTORY_PATH)
+        else:
+            _inventory = HotelInventory(SAMPLE_HOTELS)
+
+    return _inventory
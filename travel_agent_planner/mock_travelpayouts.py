@@ -0,0 +1,88 @@
+"""Local stand-in for the travelpayouts prices_for_dates endpoint.
+
+Usage: python mock_travelpayouts.py [port] [failure_rate]
+Then point the client at it: FLIGHT_API_URL=http://127.0.0.1:8765/aviasales/v3/prices_for_dates
+"""
+import calendar
+import json
+import random
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+AIRLINES = ["IB", "VY", "UX", "FR"]
+
+
+# Deterministic fake fares for one departure_at value ("YYYY-MM" or "YYYY-MM-DD")
+def fake_flights(origin: str, destination: str, departure_at: str, direct: bool):
+    parts = [int(part) for part in departure_at.split("-")]
+    if len(parts) == 2:
+        days = [(parts[0], parts[1], day) for day in range(1, calendar.monthrange(*parts)[1] + 1)]
+    else:
+        days = [tuple(parts)]
+
+    flights = []
+    for year, month, day in days:
+        rng = random.Random(f"{origin}{destination}{year}{month}{day}")
+        for _ in range(3):
+            transfers = 0 if direct else rng.choice([0, 0, 1])
+            flights.append({
+                "origin": origin,
+                "destination": destination,
+                "airline": rng.choice(AIRLINES),
+                "flight_number": str(rng.randrange(100, 9999)),
+                "departure_at": f"{year:04d}-{month:02d}-{day:02d}T{rng.randrange(6, 22):02d}:00:00+02:00",
+                "price": rng.randrange(30, 250),
+                "transfers": transfers,
+                "duration": rng.randrange(60, 180) + 90 * transfers,
+            })
+
+    return sorted(flights, key=lambda flight: flight["price"])
+
+
+def make_handler(failure_rate: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if random.random() < failure_rate:
+                self._send(503, {"success": False, "error": "try again"})
+                return
+
+            query = {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+            if not all(key in query for key in ("origin", "destination", "departure_at")):
+                self._send(400, {"success": False, "error": "missing parameters"})
+                return
+
+            data = fake_flights(query["origin"], query["destination"], query["departure_at"],
+                                query.get("direct") == "true")
+            self._send(200, {"success": True, "data": data, "currency": query.get("currency", "usd")})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# Start the mock on a background thread, returns (server, url)
+def start_mock_server(port: int = 0, failure_rate: float = 0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(failure_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/aviasales/v3/prices_for_dates"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    failure_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(failure_rate))
+    print(f"Mock travelpayouts on http://127.0.0.1:{port}/aviasales/v3/prices_for_dates")
+    server.serve_forever()
@@ -0,0 +1,63 @@
+"""Local stand-in for the weatherapi.com current.json endpoint.
+
+Usage: python mock_weatherapi.py [port] [delay_seconds]
+Then point the client at it: WEATHER_API_URL=http://127.0.0.1:8766/v1/current.json
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CONDITIONS = ["Sunny", "Partly cloudy", "Cloudy", "Light rain", "Clear"]
+
+
+def make_handler(delay: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_GET(self):
+            Handler.requests_served += 1
+            time.sleep(delay)
+
+            city = parse_qs(urlsplit(self.path).query).get("q", [""])[0]
+            if not city:
+                self._send(400, {"error": {"code": 1003, "message": "Parameter q is missing."}})
+                return
+
+            rng = random.Random(city.lower())
+            self._send(200, {
+                "location": {"name": city.title()},
+                "current": {"temp_c": round(rng.uniform(-5, 35), 1), "condition": {"text": rng.choice(CONDITIONS)}},
+            })
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# Start the mock on a background thread, returns (server, url)
+def start_mock_server(port: int = 0, delay: float = 0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/current.json"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8766
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay))
+    print(f"Mock weatherapi on http://127.0.0.1:{port}/v1/current.json")
+    server.serve_forever()
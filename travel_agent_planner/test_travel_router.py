@@ -0,0 +1,33 @@
+import os
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from travel_planner import travel_router
+
+
+def route_name(text):
+    route = travel_router.route(text)
+    return route.name if route else None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("I need a flight from New York to Chicago tomorrow", "flight"),
+    ("Are there cheap flights from Boston to Miami on Friday?", "flight"),
+    ("Find me a hotel in Paris with a pool for under $400 per night", "hotel"),
+    ("Any hostels in Lisbon for 3 nights?", "hotel"),
+])
+def test_single_intent_requests_go_to_the_specialist(query, expected):
+    assert route_name(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "Plan a 5 day trip to Rome with $3000, include hotel in the center",
+    "I'm planning a trip to Tokyo next month, I'd like hotels in Shinjuku, and suggest activities",
+    "Are flights from Boston to Miami cheaper in winter? Plan a trip for me",
+    "Flights from Denver to Paris and a hotel in the Marais for two weeks",
+    "Hotel in Barcelona and things to do nearby",
+    "Give me an itinerary with flights from LA to Honolulu",
+])
+def test_trip_planning_requests_go_to_the_travel_agent(query):
+    assert route_name(query) is None
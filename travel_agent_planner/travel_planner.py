@@ -1,11 +1,18 @@
 import os , requests
 from dotenv import load_dotenv
-from agents import Agent, Runner, function_tool , InputGuardrailTripwireTriggered, InputGuardrail, GuardrailFunctionOutput, RunContextWrapper
+from agents import Agent, function_tool , InputGuardrailTripwireTriggered, InputGuardrail, GuardrailFunctionOutput, RunContextWrapper
 from pydantic import BaseModel, Field
 from typing import List, Optional
-import asyncio, json
+import asyncio, json, sys, time
 from dataclasses import dataclass
 from datetime import datetime
+from hotel_inventory import get_inventory
+from flight_schedule import get_schedule
+from Get_Weather_API import get_weather_tool as live_weather_tool, weather_client
+from agent_common.tool_cache import cached_tool
+from agent_common.model_cache import cached_run, ModelCacheMissError
+from agent_common.agent_metrics import instrumented_run, instrumented_tool, render_metrics, start_metrics_server
+from agent_common.pre_router import PreRouter
 
 
 # -- Setting API KEY and MODEL ---
@@ -84,22 +91,41 @@ budget_analysis_agent = Agent(
 async def budget_guardrails(ctx, agent, input_data):
     """ Check if the budget is realistic """
     try:
-        result = await Runner.run(budget_analysis_agent,input_data)
+        result = await cached_run(budget_analysis_agent, input_data, run=instrumented_run, stage="budget_guardrail")
         final_output = result.final_output_as(BudgetAnalysis)
 
         return GuardrailFunctionOutput(
             output_info=final_output,
             tripwire_triggered=not final_output.is_realistic,
-            message=None if final_output.is_realistic else f"Your budget may not be realistic: {final_output.reasoning}"
         )
 
+    # Strict replay must not silently pass the guardrail
+    except ModelCacheMissError:
+        raise
+
     except Exception as e:
         return GuardrailFunctionOutput(
         output_info = BudgetAnalysis(is_realistic=True, reasoning=f"Error analyzing budget: {str(e)}"),
         tripwire_triggered= False
     )
+
+# --- Guardrail Modes ---
+# "parallel": the SDK runs the budget check alongside the agent's first model
+#             turn and discards the run if the tripwire fires
+# "sequential": the check finishes before the agent's first model turn starts
+GUARDRAIL_MODES = ("parallel", "sequential")
+GUARDRAIL_MODE = os.getenv("GUARDRAIL_MODE", "parallel")
+
+budget_guardrails_by_mode = {
+    "parallel": InputGuardrail(guardrail_function=budget_guardrails),
+    "sequential": InputGuardrail(guardrail_function=budget_guardrails, run_in_parallel=False),
+}
+budget_guardrail = budget_guardrails_by_mode["parallel"]
+
 # --- Tools for the Agents ---  
 @function_tool
+@instrumented_tool
+@cached_tool(ttl=60 * 60)
 async def get_weather_tool(city: str, date: str) -> str:
     """Get the weather forecast for a city on a specific date."""
 
@@ -131,97 +157,45 @@ async def get_weather_tool(city: str, date: str) -> str:
         return f"Weather forecast for {city} is not available."
     
 @function_tool
+@instrumented_tool
+@cached_tool(ttl=5 * 60, context_fields=("preferred_airlines",))
 def get_flights_tool(wrapper: RunContextWrapper[UserContext],origin: str, destination: str, date: str):
     """Search for flights between two cities on a specific date."""
-    flight_options = [
-        {
-            "airline": "SkyWays",
-            "departure_time": "08:00",
-            "arrival_time": "10:30",
-            "price": 350.00,
-            "direct": True
-        },
-        {
-            "airline": "OceanAir",
-            "departure_time": "12:45",
-            "arrival_time": "15:15",
-            "price": 275.50,
-            "direct": True
-        },
-        {
-            "airline": "MountainJet",
-            "departure_time": "16:30",
-            "arrival_time": "21:45",
-            "price": 225.75,
-            "direct": False
-        }
-    ]
-    
+    preferred_airlines = []
+
     # Applying User Preference/Context for airlines
     if wrapper and wrapper.context:
         preferred_airlines = wrapper.context.preferred_airlines
 
-        if preferred_airlines:
-            # Moving preferred_airlines on top
-            flight_options.sort(key=lambda x: x["airlines"] not in preferred_airlines)
+    # Indexed schedule, only the best ranked flights go back to the model
+    flight_options = get_schedule().search(origin, destination, date, preferred_airlines=preferred_airlines)
 
-            for flight in flight_options:
-                if flight["airline"] in preferred_airlines:
-                    flight["preferred"] = True
-                
     return json.dumps(flight_options)
 
 @function_tool
+@instrumented_tool
+@cached_tool(ttl=5 * 60, context_fields=("hotel_amenities", "budget_level"))
 def get_hotels_tool(wrapper: RunContextWrapper[UserContext],city: str, check_in: str, check_out: str, max_price: Optional[float] = None) -> str:
     """Search for hotels in a city for specific dates within a price range."""
-    hotel_options = [
-        {
-            "name": "City Center Hotel",
-            "location": "Downtown",
-            "price_per_night": 199.99,
-            "amenities": ["WiFi", "Pool", "Gym", "Restaurant"]
-        },
-        {
-            "name": "Riverside Inn",
-            "location": "Riverside District",
-            "price_per_night": 149.50,
-            "amenities": ["WiFi", "Free Breakfast", "Parking"]
-        },
-        {
-            "name": "Luxury Palace",
-            "location": "Historic District",
-            "price_per_night": 349.99,
-            "amenities": ["WiFi", "Pool", "Spa", "Fine Dining", "Concierge"]
-        }
-    ]
-    
-    # Filter by max price if provided
-    if max_price is not None:
-        filtered_hotels = [hotel for hotel in hotel_options if hotel["price_per_night"] <= max_price]
-    else:
-        filtered_hotels = hotel_options
-    
+    preferred_amenities = []
+    budget_level = None
+
     # Applying user context
     if wrapper and wrapper.context:
         preferred_amenities = wrapper.context.hotel_amenities
         budget_level = wrapper.context.budget_level
 
-        if preferred_amenities:
-            # Calculating score based on amenities preference
-            for hotel in preferred_amenities:
-                match_amenities = [x for x in hotel["amenities"] in preferred_amenities]
-                hotel["matching_amenities"] = match_amenities
-                hotel["preferred_amenities_score"] = len(match_amenities)
-            
-            filtered_hotels.sort(key=lambda x: x["preferred_amenities_score"], reverse=True)
-
-        if budget_level:
-            if budget_level == "budget":
-                filtered_hotels.sort(key=lambda x: x["price_per_night"])
-            elif budget_level == "luxury":
-                filtered_hotels.sort(key=lambda x: x["price_per_night"], reverse=True)
+    # Indexed inventory, see hotel_inventory.py
+    hotels = get_inventory().search(
+        city,
+        check_in,
+        check_out,
+        max_price=max_price,
+        amenities=preferred_amenities,
+        budget_level=budget_level,
+    )
 
-    return json.dumps(filtered_hotels)
+    return json.dumps(hotels)
 
 # --- Special Agents ---
 hotel_agent = Agent(
@@ -257,6 +231,20 @@ flight_agent = Agent(
     output_type=FlightRecommendation
 )
     
+# "api" uses live weather from weatherapi.com (Get_Weather_API.py) instead of the simulated forecast
+WEATHER_SOURCE = os.getenv("WEATHER_SOURCE", "simulated")
+
+# Live weather client lifecycle for the entry points (main, batch_planner):
+# warm the cache for WEATHER_HOT_DESTINATIONS, then close the pooled client
+async def start_weather_client():
+    if WEATHER_SOURCE == "api":
+        await weather_client.prefetch()
+
+async def stop_weather_client():
+    if WEATHER_SOURCE == "api":
+        print(f"Weather client: {weather_client.stats()}", file=sys.stderr)
+        await weather_client.close()
+
 # --- Main Travel Agent ---
 travel_agent = Agent(
     name="Travel Planner Assistant",
@@ -281,14 +269,95 @@ travel_agent = Agent(
     """,
     model=model,
     handoffs=[flight_agent,hotel_agent],
-    tools=[get_weather_tool],
-    input_guardrails=[
-        InputGuardrail(guardrail_function=budget_guardrails)
-    ],
+    tools=[live_weather_tool if WEATHER_SOURCE == "api" else get_weather_tool],
+    input_guardrails=[budget_guardrail],
     output_type=TravelPlan,
 )
 
-async def main():
+# --- Pre-Router ---
+# Obvious flight and hotel requests skip the travel agent's handoff turn and go
+# straight to the specialist, everything else is triaged by the travel agent.
+# Requests that also ask for a trip plan need a TravelPlan, so they always go
+# through the travel agent even when they mention a flight or a hotel
+travel_router = PreRouter("travel")
+travel_router.exclude(
+    r"\b(trips?|plan|plans|planning|itinerary|itineraries|vacation|holiday|getaway)\b",
+    r"\b(activities|things to do|sightseeing|attractions)\b",
+    r"\b\d+[\s-]*(days?|weeks?)\b",
+    r"\b(a|one|two|three|four|five|six|seven|ten|fourteen)[\s-]+(days?|weeks?|weekends?)\b",
+)
+travel_router.add_route(
+    "flight", flight_agent,
+    r"\bflights?\b.*\bfrom\s+\w.*\bto\s+\w",
+    r"\bfly(ing)?\s+from\s+\w.*\bto\s+\w",
+)
+travel_router.add_route(
+    "hotel", hotel_agent,
+    r"\b(hotels?|hostels?|accommodations?|place to stay)\b.*\bin\s+\w",
+)
+
+# Entry agents per guardrail mode. Specialists reached through the router
+# keep the budget check
+guarded_agents = {
+    mode: {
+        agent.name: agent.clone(input_guardrails=[guardrail])
+        for agent in (travel_agent, flight_agent, hotel_agent)
+    }
+    for mode, guardrail in budget_guardrails_by_mode.items()
+}
+
+async def run_travel_agent(query, context=None, mode=GUARDRAIL_MODE):
+    route = travel_router.route(query)
+    agent = guarded_agents[mode][route.target.name if route else travel_agent.name]
+    return await instrumented_run(agent, query, stage="travel", context=context)
+
+def print_result(result):
+    if hasattr(result.final_output,"airline"):
+        flight = result.final_output
+        print("\n✈️ FLIGHT RECOMMENDATION ✈️")
+        print(f"Airline: {flight.airline}")
+        print(f"Departure: {flight.departure_time}")
+        print(f"Arrival: {flight.arrival_time}")
+        print(f"Price: ${flight.price}")
+        print(f"Direct Flight: {'Yes' if flight.direct_flight else 'No'}")
+        print(f"\nWhy this flight: {flight.recommendation_reason}")
+
+    elif hasattr(result.final_output,"amenities"):
+        hotel = result.final_output
+        print("\n🏨 HOTEL RECOMMENDATION 🏨")
+        print(f"Name: {hotel.name}")
+        print(f"Location: {hotel.location}")
+        print(f"Price per night: ${hotel.price_per_night}")
+        
+        print("\nAmenities:")
+        for i, amenity in enumerate(hotel.amenities, 1):
+            print(f"  {i}. {amenity}")
+            
+        print(f"\nWhy this hotel: {hotel.recommendation_reason}")
+
+    elif hasattr(result.final_output,"destination"):
+        travel_plan = result.final_output
+        print("\nFINAL RESPONSE: ")
+        print(f"\n🌍 TRAVEL PLAN FOR {travel_plan.destination.upper()} 🌍")
+        print(f"Duration: {travel_plan.duration_days} days")
+        print(f"Budget: ${travel_plan.budget}")
+
+        print("\n🎯 RECOMMENDED ACTIVITIES: ")
+        for i, activity in enumerate(travel_plan.activities,1):
+            print(f" {i}. {activity}")
+
+        print(f"\n📝 NOTES: {travel_plan.notes}")
+
+    else: 
+        print(result.final_output)
+
+
+# Metrics for CLI runs: served on METRICS_PORT while running and/or written
+# to METRICS_FILE (Prometheus textfile format) at the end
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_FILE = os.getenv("METRICS_FILE")
+
+async def run_sample_queries(modes=None):
     queries = [
         "I'm planning a trip to Miami for 5 days with a budget of $2000. What should I do there?",
         "I'm planning a trip to Tokyo for a week, looking to spend under $5,000. Suggestions?",
@@ -297,54 +366,48 @@ async def main():
         "I want to go to Dubai for a week with only $300"  # This should trigger the budget guardrail
     ]
 
-    for query in queries:
-        print("\n" + "="*50)
-        print(f"Query: {query}")
-        try:
-            result = await Runner.run(travel_agent,query)
-
-
-            if hasattr(result.final_output,"airline"):
-                flight = result.final_output
-                print("\n✈️ FLIGHT RECOMMENDATION ✈️")
-                print(f"Airline: {flight.airline}")
-                print(f"Departure: {flight.departure_time}")
-                print(f"Arrival: {flight.arrival_time}")
-                print(f"Price: ${flight.price}")
-                print(f"Direct Flight: {'Yes' if flight.direct_flight else 'No'}")
-                print(f"\nWhy this flight: {flight.recommendation_reason}")
-
-            elif hasattr(result.final_output,"amenities"):
-                hotel = result.final_output
-                print("\n🏨 HOTEL RECOMMENDATION 🏨")
-                print(f"Name: {hotel.name}")
-                print(f"Location: {hotel.location}")
-                print(f"Price per night: ${hotel.price_per_night}")
-                
-                print("\nAmenities:")
-                for i, amenity in enumerate(hotel.amenities, 1):
-                    print(f"  {i}. {amenity}")
-                    
-                print(f"\nWhy this hotel: {hotel.recommendation_reason}")
-
-            elif hasattr(result.final_output,"destination"):
-                travel_plan = result.final_output
-                print("\nFINAL RESPONSE: ")
-                print(f"\n🌍 TRAVEL PLAN FOR {travel_plan.destination.upper()} 🌍")
-                print(f"Duration: {travel_plan.duration_days} days")
-                print(f"Budget: ${travel_plan.budget}")
-
-                print("\n🎯 RECOMMENDED ACTIVITIES: ")
-                for i, activity in enumerate(travel_plan.activities,1):
-                    print(f" {i}. {activity}")
-
-                print(f"\n📝 NOTES: {travel_plan.notes}")
-
-            else: 
-                print(result.final_output)
-                
-        except InputGuardrailTripwireTriggered as e:
-              print("\n⚠️ GUARDRAIL TRIGGERED ⚠️")
+    modes = modes or [GUARDRAIL_MODE]
+    latencies = {mode: [] for mode in modes}
+
+    for mode in modes:
+        for query in queries:
+            print("\n" + "="*50)
+            print(f"Query: {query} [{mode}]")
+            start = time.perf_counter()
+            try:
+                result = await run_travel_agent(query, mode=mode)
+                print_result(result)
+
+            except InputGuardrailTripwireTriggered as e:
+                  print("\n⚠️ GUARDRAIL TRIGGERED ⚠️")
+
+            elapsed = time.perf_counter() - start
+            latencies[mode].append(elapsed)
+            print(f"\n⏱️ {elapsed:.2f}s ({mode})")
+
+    # Latency per guardrail mode
+    print("\n" + "="*50)
+    for mode, values in latencies.items():
+        print(f"{mode:<11} total {sum(values):.2f}s  mean {sum(values) / len(values):.2f}s  "
+              f"max {max(values):.2f}s")
+
+    print(f"Pre-router: {travel_router.stats()}")
+
+async def main(modes=None):
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+
+    await start_weather_client()
+    try:
+        await run_sample_queries(modes)
+    finally:
+        await stop_weather_client()
+
+    if METRICS_FILE:
+        with open(METRICS_FILE, "w") as f:
+            f.write(render_metrics())
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # python travel_planner.py [parallel|sequential|compare]
+    mode = sys.argv[1] if len(sys.argv) > 1 else GUARDRAIL_MODE
+    asyncio.run(main(list(GUARDRAIL_MODES) if mode == "compare" else [mode]))
\ No newline at end of file